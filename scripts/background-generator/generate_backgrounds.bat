@@ -1,10 +1,11 @@
 @echo off
-echo Installing required packages...
-pip install -r requirements.txt
+cd /d "%~dp0..\.."
+echo Checking required packages...
+python -m scripts.cardgen check --install
 
 echo.
 echo Starting background generation...
-python generate_backgrounds.py
+python -m scripts.cardgen backgrounds %*
 
 echo.
 echo Press any key to exit...
@@ -1,11 +1,12 @@
 #!/bin/bash
+cd "$(dirname "$0")/../.." || exit 1
 
-echo "Installing required packages..."
-pip install -r requirements.txt
+echo "Checking required packages..."
+python3 -m scripts.cardgen check --install || exit 1
 
 echo ""
 echo "Starting background generation..."
-python3 generate_backgrounds.py
+python3 -m scripts.cardgen backgrounds "$@"
 
 echo ""
 echo "Background generation complete!"
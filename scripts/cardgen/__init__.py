@@ -0,0 +1,7 @@
+"""
+Generators for the event card assets: backgrounds, decorations, the
+decoration atlas, composited invitations and per-guest renders
+
+Run `python -m scripts.cardgen --help` from the project root. Nothing is
+imported here, so importing one module never loads the others.
+"""
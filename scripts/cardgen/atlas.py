@@ -0,0 +1,219 @@
+"""
+Pack all decoration SVGs into a single sprite atlas
+
+Runs after generate_decorations(): every SVG in elements/decorations becomes
+a <symbol> in atlas.svg, laid out on a grid with a matching <view>, so the
+config can reference "atlas.svg#balloons" instead of "balloons.svg". An
+optional raster sprite sheet (PNG/WebP) is rendered from the same layout.
+"""
+
+import os
+import re
+import json
+import argparse
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+ET.register_namespace('', SVG_NS)
+ET.register_namespace('xlink', XLINK_NS)
+
+# Output names; files starting with ATLAS_NAME are never packed into the atlas
+ATLAS_NAME = "atlas"
+
+# Widest a row of sprites may get before wrapping, in SVG user units
+MAX_ROW_WIDTH = 2000
+
+# Space left between sprites so antialiasing never bleeds into a neighbour
+SPRITE_PADDING = 2
+
+URL_REF_RE = re.compile(r'url\(#([^)]+)\)')
+
+def view_box(root):
+    """Return (x, y, width, height) of an SVG root from its viewBox or size"""
+    box = root.get('viewBox')
+    if box:
+        return tuple(float(v) for v in box.replace(',', ' ').split())
+    width = float(re.sub(r'[a-z%]+$', '', root.get('width', '100')))
+    height = float(re.sub(r'[a-z%]+$', '', root.get('height', '100')))
+    return (0.0, 0.0, width, height)
+
+def prefix_ids(root, prefix):
+    """Make every id in a document unique by prefixing it, updating references
+
+    Separate files happily reuse ids like "glow"; once they share one atlas
+    those would collide, so ids and their url(#...)/href="#..." uses are
+    rewritten in place.
+    """
+    ids = {el.get('id') for el in root.iter() if el.get('id')}
+    if not ids:
+        return
+
+    def rename(match):
+        ref = match.group(1)
+        return f"url(#{prefix}{ref})" if ref in ids else match.group(0)
+
+    href_keys = ('href', f'{{{XLINK_NS}}}href')
+    for el in root.iter():
+        for key, value in el.attrib.items():
+            if key == 'id':
+                el.set(key, prefix + value)
+            elif key in href_keys and value.startswith('#') and value[1:] in ids:
+                el.set(key, f"#{prefix}{value[1:]}")
+            elif 'url(#' in value:
+                el.set(key, URL_REF_RE.sub(rename, value))
+
+def collect_sprites(decorations_dir):
+    """Parse every packable SVG in the directory, sorted by name"""
+    sprites = []
+    for path in sorted(decorations_dir.glob('*.svg')):
+        if path.name.startswith(ATLAS_NAME):
+            continue
+        try:
+            root = ET.parse(path).getroot()
+        except ET.ParseError as e:
+            print(f"Skipping {path.name}: {e}")
+            continue
+        sprites.append((path, root))
+    return sprites
+
+def shelf_layout(sizes, max_width=MAX_ROW_WIDTH, padding=SPRITE_PADDING):
+    """Place (width, height) boxes in rows; returns positions and total size"""
+    positions = []
+    x = y = row_height = total_width = 0
+    for width, height in sizes:
+        if x and x + width > max_width:
+            x, y = 0, y + row_height + padding
+            row_height = 0
+        positions.append((x, y))
+        x += width + padding
+        row_height = max(row_height, height)
+        total_width = max(total_width, x - padding)
+    return positions, (total_width, y + row_height)
+
+def build_atlas(sprites):
+    """Build the atlas document and its coordinate map"""
+    atlas = ET.Element(f'{{{SVG_NS}}}svg')
+    defs = ET.SubElement(atlas, f'{{{SVG_NS}}}defs')
+
+    # Tall sprites first keeps the rows of the shelf layout tight
+    boxes = [(path, root, view_box(root)) for path, root in sprites]
+    boxes.sort(key=lambda item: (-item[2][3], item[0].stem))
+    positions, (atlas_width, atlas_height) = shelf_layout(
+        [(int(-(-box[2] // 1)), int(-(-box[3] // 1))) for _, _, box in boxes])
+
+    sprite_map = {}
+    for (path, root, box), (x, y) in zip(boxes, positions):
+        name = path.stem
+        prefix_ids(root, f"{name}--")
+        symbol = ET.SubElement(defs, f'{{{SVG_NS}}}symbol', {
+            'id': f"{name}-symbol",
+            'viewBox': " ".join(f"{v:g}" for v in box),
+        })
+        symbol.extend(list(root))
+
+        width, height = box[2], box[3]
+        ET.SubElement(atlas, f'{{{SVG_NS}}}use', {
+            'href': f"#{name}-symbol",
+            'x': f"{x:g}", 'y': f"{y:g}", 'width': f"{width:g}", 'height': f"{height:g}",
+        })
+        # A <view> lets <img src="atlas.svg#name"> show just this sprite
+        ET.SubElement(atlas, f'{{{SVG_NS}}}view', {
+            'id': name,
+            'viewBox': f"{x:g} {y:g} {width:g} {height:g}",
+        })
+        sprite_map[name] = {
+            'source': path.name,
+            'fragment': f"{ATLAS_NAME}.svg#{name}",
+            'symbol': f"{name}-symbol",
+            'x': x, 'y': y, 'width': width, 'height': height,
+        }
+
+    atlas.set('width', str(atlas_width))
+    atlas.set('height', str(atlas_height))
+    atlas.set('viewBox', f"0 0 {atlas_width} {atlas_height}")
+    return atlas, sprite_map, (atlas_width, atlas_height)
+
+def render_sheet(svg_bytes, size, scale, formats, output_dir):
+    """Rasterize the atlas into PNG/WebP sprite sheets
+
+    Uses cairosvg when it (and the native cairo library it wraps) is
+    available, else the built-in rasterizer. Returns the written file
+    names, or an empty list when neither can draw the atlas.
+    """
+    import io
+    from PIL import Image
+    from .rasterize import UnsupportedSVG, rasterize
+
+    width, height = round(size[0] * scale), round(size[1] * scale)
+    try:
+        import cairosvg
+    except (ImportError, OSError) as e:
+        try:
+            sheet = rasterize(svg_bytes, width, height)
+        except UnsupportedSVG as unsupported:
+            print(f"Skipping raster sprite sheet (cairosvg unavailable: {e.__class__.__name__}; "
+                  f"built-in rasterizer: {unsupported})")
+            return []
+    else:
+        sheet = Image.open(io.BytesIO(cairosvg.svg2png(bytestring=svg_bytes, output_width=width,
+                                                       output_height=height)))
+    files = []
+    for fmt in formats:
+        filename = f"{ATLAS_NAME}.{fmt}"
+        if fmt == 'png':
+            sheet.save(output_dir / filename, 'PNG', optimize=True)
+        else:
+            sheet.save(output_dir / filename, 'WEBP', lossless=True)
+        files.append(filename)
+    return files
+
+def pack_atlas(decorations_dir="elements/decorations", raster_formats=(), raster_scale=1.0):
+    """Write atlas.svg and atlas.json (plus optional raster sheets) for a directory"""
+    decorations_dir = Path(decorations_dir)
+    sprites = collect_sprites(decorations_dir)
+    atlas, sprite_map, size = build_atlas(sprites)
+
+    svg_bytes = ET.tostring(atlas, encoding='utf-8', xml_declaration=False)
+    atlas_path = decorations_dir / f"{ATLAS_NAME}.svg"
+    atlas_path.write_bytes(svg_bytes)
+
+    coordinate_map = {
+        'atlas': atlas_path.name,
+        'width': size[0],
+        'height': size[1],
+        'sprites': sprite_map,
+    }
+    sheets = render_sheet(svg_bytes, size, raster_scale, raster_formats, decorations_dir) if raster_formats else []
+    if sheets:
+        coordinate_map['sheets'] = {'files': sheets, 'scale': raster_scale}
+
+    map_path = decorations_dir / f"{ATLAS_NAME}.json"
+    with open(map_path, 'w', newline='\n') as f:
+        json.dump(coordinate_map, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+    print(f"Packed {len(sprite_map)} decorations into {atlas_path} "
+          f"({os.path.getsize(atlas_path)} bytes, {size[0]}x{size[1]})")
+    return coordinate_map
+
+def parse_args(argv=None, prog=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(prog=prog, description="Pack decoration SVGs into one symbol atlas")
+    parser.add_argument('--dir', default="elements/decorations",
+                        help="directory of decoration SVGs (default: elements/decorations)")
+    parser.add_argument('--raster', action='append', choices=['png', 'webp'], default=[],
+                        help="also render a raster sprite sheet in this format; repeatable")
+    parser.add_argument('--raster-scale', type=float, default=1.0,
+                        help="pixels per SVG unit in the raster sheet (default: 1.0)")
+    return parser.parse_args(argv)
+
+def main(argv=None, prog=None):
+    """Pack the atlas for the given directory"""
+    args = parse_args(argv, prog)
+    pack_atlas(args.dir, args.raster, args.raster_scale)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1183 @@
+"""
+Draw, post-process and encode background images
+Uses PIL/Pillow for image generation
+
+The background generators, effects, tiled renderer and encoders; see
+backgrounds for the build that drives them.
+"""
+
+import io
+import os
+import random
+import math
+import time
+import cProfile
+import struct
+import zlib
+from contextlib import contextmanager
+from PIL import Image, ImageDraw, ImageFilter, ImageChops, ImageStat
+
+from .backgrounds import BACKGROUNDS_DIR, DEFAULT_MIN_PSNR, GENERATOR_NAMES, choose_style, color_palettes
+from .scene import CIRCLE, ELLIPSE, OPEN_KINDS, POLYGON, POLYLINE, QUAD, RECT, Scene
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to the pure-PIL renderers
+    np = None
+
+def create_gradient_background(width, height, colors, angle=90, tiled=False):
+    """Create a linear gradient background
+    
+    angle is in degrees with y pointing down: 0 runs left to right, 90 runs
+    top to bottom. Any number of colors is spread evenly along the ramp.
+    """
+    # Round away float noise so axis-aligned angles get exact integer extents
+    cos_a = round(math.cos(math.radians(angle)), 12)
+    sin_a = round(math.sin(math.radians(angle)), 12)
+    extent = max(int(math.ceil(abs(width * cos_a) + abs(height * sin_a))), 1)
+    offset = -min(0, width * cos_a) - min(0, height * sin_a)
+    
+    # One pixel per step along the gradient axis, plus a guard pixel at the end
+    ramp = Image.new('RGB', (extent + 1, 1))
+    ramp.putdata([interpolate_color(colors, min(i / extent, 1.0)) for i in range(extent + 1)])
+    
+    def render(box):
+        # Project every pixel of the box onto the axis and look it up in the ramp
+        left, top, right, bottom = box
+        return ramp.transform((right - left, bottom - top), Image.AFFINE,
+                              (cos_a, sin_a, offset + cos_a * left + sin_a * top, 0, 0, 0),
+                              resample=Image.NEAREST)
+    return render if tiled else render((0, 0, width, height))
+
+def interpolate_color(colors, ratio):
+    """Interpolate between evenly spaced color stops at ratio (0.0 - 1.0)"""
+    segments = len(colors) - 1
+    index = min(int(ratio * segments), segments - 1)
+    local = (ratio - index / segments) * segments
+    start, end = colors[index], colors[index + 1]
+    return tuple(int(start[c] + (end[c] - start[c]) * local) for c in range(3))
+
+def interpolate_color_array(colors, ratio):
+    """Vectorized interpolate_color: map an array of ratios to an RGB uint8 array"""
+    stops = np.asarray(colors, dtype=np.float64)
+    segments = len(colors) - 1
+    index = np.minimum((ratio * segments).astype(np.intp), segments - 1)
+    local = (ratio - index / segments) * segments
+    start, end = stops[index], stops[index + 1]
+    rgb = start + (end - start) * local[..., np.newaxis]
+    # Truncate like int() does in the scalar path so both renderers agree
+    return rgb.astype(np.uint8)
+
+def create_radial_gradient(width, height, colors, tiled=False):
+    """Create a radial gradient background"""
+    if np is None:
+        render = lambda box: _create_radial_gradient_pil(width, height, colors, box)
+        return render if tiled else render((0, 0, width, height))
+    
+    center_x, center_y = width // 2, height // 2
+    max_radius = math.sqrt(center_x**2 + center_y**2)
+    
+    def render(box):
+        # Distance field via broadcasting a column of y offsets against a row of x offsets
+        left, top, right, bottom = box
+        dx = np.arange(left, right, dtype=np.float64) - center_x
+        dy = np.arange(top, bottom, dtype=np.float64)[:, np.newaxis] - center_y
+        ratio = np.minimum(np.sqrt(dx**2 + dy**2) / max_radius, 1.0)
+        return Image.fromarray(interpolate_color_array(colors, ratio))
+    return render if tiled else render((0, 0, width, height))
+
+def _create_radial_gradient_pil(width, height, colors, box):
+    """Per-pixel radial gradient of one box, used when NumPy is not installed"""
+    left, top, right, bottom = box
+    img = Image.new('RGB', (right - left, bottom - top))
+    draw = ImageDraw.Draw(img)
+    
+    center_x, center_y = width // 2, height // 2
+    max_radius = math.sqrt(center_x**2 + center_y**2)
+    
+    for y in range(top, bottom):
+        for x in range(left, right):
+            distance = math.sqrt((x - center_x)**2 + (y - center_y)**2)
+            ratio = min(distance / max_radius, 1.0)
+            draw.point((x - left, y - top), fill=interpolate_color(colors, ratio))
+    
+    return img
+
+class ShapeLayer(Scene):
+    """A Scene drawn with ImageDraw, so the same shapes can be drawn onto any tile
+    
+    Generators draw on a ShapeLayer just as on an ImageDraw; the shapes are
+    kept in the scene's columns and render(box) replays those overlapping
+    the box, shifted into its coordinates. Given the palette every fill
+    comes from, it renders 1-byte P images instead of RGB.
+    """
+    
+    __slots__ = ('colors',)
+    
+    def __init__(self, width, height, palette=None):
+        super().__init__(width, height, palette)
+        self.colors = palette
+    
+    @staticmethod
+    def _points(xy):
+        points = xy if isinstance(xy[0], (tuple, list)) else list(zip(xy[::2], xy[1::2]))
+        # Whole-pixel points rasterize the same wherever a tile puts them
+        return [(round(x), round(y)) for x, y in points]
+    
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        (x0, y0), (x1, y1) = self._points(xy)
+        self.rect(x0, y0, x1 - x0, y1 - y0, fill=fill, stroke=outline, stroke_width=width)
+    
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        (x0, y0), (x1, y1) = self._points(xy)
+        self.add(ELLIPSE, [((x0 + x1) / 2, (y0 + y1) / 2)], fill=fill, stroke=outline, stroke_width=width,
+                 size=((x1 - x0) / 2, (y1 - y0) / 2))
+    
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        self.add(POLYGON, self._points(xy), fill=fill, stroke=outline, stroke_width=width)
+    
+    def line(self, xy, fill=None, width=0):
+        self.add(POLYLINE, self._points(xy), stroke=fill, stroke_width=width)
+    
+    def render(self, box=None):
+        """Draw the shapes inside box (default: the whole canvas) onto a new image
+        
+        The box is drawn with an overlap past its edges and cropped, so a
+        line crossing a tile border is cut where the full frame has it,
+        not where the tile starts.
+        """
+        left, top, right, bottom = box = box or (0, 0, self.width, self.height)
+        overlap = int(max(self.stroke_width, default=0)) + 2
+        outer = (max(left - overlap, 0), max(top - overlap, 0),
+                 min(right + overlap, self.width), min(bottom + overlap, self.height))
+        img = self._draw(outer)
+        if outer == box:
+            return img
+        return img.crop((left - outer[0], top - outer[1], right - outer[0], bottom - outer[1]))
+    
+    def _draw(self, box):
+        """Draw the shapes overlapping box onto a new image of its size"""
+        left, top, right, bottom = box
+        if self.colors:
+            img = indexed_image((right - left, bottom - top), self.colors)
+            first = {tuple(color): i for i, color in reversed(list(enumerate(self.colors)))}
+            ink = [first[tuple(color)] for color in self.palette]
+        else:
+            img = Image.new('RGB', (right - left, bottom - top))
+            ink = self.palette
+        draw = ImageDraw.Draw(img)
+        for i in range(len(self)):
+            # Pad the bounds by the stroke so culling never clips a line's edge
+            pad = max(self.stroke_width[i], 1) + 1
+            x0, y0, x1, y1 = self.bounds(i)
+            if x1 + pad < left or y1 + pad < top or x0 - pad >= right or y0 - pad >= bottom:
+                continue
+            kind, fill, stroke = self.kind[i], self.fill[i], self.stroke[i]
+            options = {'fill': ink[fill] if fill >= 0 else None}
+            if kind in OPEN_KINDS:
+                options = {'fill': ink[stroke] if stroke >= 0 else None, 'width': round(self.stroke_width[i])}
+            elif stroke >= 0:
+                options.update(outline=ink[stroke], width=round(self.stroke_width[i]))
+            if kind in (RECT, CIRCLE, ELLIPSE) and not self.angle[i]:
+                method = draw.rectangle if kind == RECT else draw.ellipse
+                method([round(x0) - left, round(y0) - top, round(x1) - left, round(y1) - top], **options)
+                continue
+            points = self.shape_points(i) if kind != QUAD and not self.angle[i] else self.outline(i)[0][0]
+            points = [(round(x) - left, round(y) - top) for x, y in points]
+            (draw.line if kind in OPEN_KINDS else draw.polygon)(points, **options)
+        return img
+
+def indexed_image(size, palette, index=0):
+    """New P image filled with palette[index]"""
+    img = Image.new('P', size, index)
+    img.putpalette([channel for color in palette for channel in color])
+    return img
+
+# Cells smaller than this are assembled with a NumPy gather; pasting costs
+# per cell and the gather per pixel, so larger cells paste faster
+GATHER_CELL_AREA = 32 * 32
+
+class CellPattern:
+    """A canvas made of repeated cells: a few variant images and a grid of which goes where
+    
+    Each variant is drawn once however many cells show it, so building a
+    pattern costs the number of distinct cells, not the pixel area.
+    render(box) assembles the cells overlapping the box, with one NumPy
+    gather or by pasting, and fills anything outside the grid with the
+    background color.
+    """
+    
+    def __init__(self, variants, grid, size, origin=(0, 0), background=None):
+        self.variants = variants
+        self.grid = grid
+        self.rows, self.cols = len(grid), len(grid[0]) if grid else 0
+        self.size = size
+        self.cell = variants[0].size
+        self.origin = origin  # canvas position of the grid's top-left corner
+        self.background = background  # a palette index for P variants
+        self.palette = variants[0].getpalette() if variants[0].mode == 'P' else None
+        self.gather = np is not None and self.cell[0] * self.cell[1] < GATHER_CELL_AREA
+        if self.gather:
+            self.stack = np.stack([np.asarray(variant) for variant in variants])
+            self.grid = np.asarray(grid, dtype=np.intp).reshape(self.rows, self.cols)
+    
+    def _new(self, size):
+        img = Image.new(self.variants[0].mode, size, self.background)
+        if self.palette:
+            img.putpalette(self.palette)
+        return img
+    
+    def render(self, box=None):
+        """Draw the cells inside box (default: the whole canvas) onto a new image"""
+        left, top, right, bottom = box or (0, 0) + self.size
+        size = (right - left, bottom - top)
+        (cell_width, cell_height), (x0, y0) = self.cell, self.origin
+        c0, c1 = max((left - x0) // cell_width, 0), min(-((x0 - right) // cell_width), self.cols)
+        r0, r1 = max((top - y0) // cell_height, 0), min(-((y0 - bottom) // cell_height), self.rows)
+        # Where the first cell lands in the image; negative when it starts before the box
+        dx, dy = x0 + c0 * cell_width - left, y0 + r0 * cell_height - top
+        if self.gather and c0 < c1 and r0 < r1:
+            cells = self.stack[self.grid[r0:r1, c0:c1]]
+            # rows, columns, cell rows, cell columns[, channels] -> pixel rows, pixel columns[, channels]
+            block = cells.swapaxes(1, 2).reshape((r1 - r0) * cell_height, (c1 - c0) * cell_width,
+                                                 *cells.shape[4:])
+            block = Image.fromarray(np.ascontiguousarray(block[max(-dy, 0):size[1] - dy, max(-dx, 0):size[0] - dx]))
+            if self.palette:
+                block.putpalette(self.palette)
+            if block.size == size:
+                return block
+            img = self._new(size)
+            img.paste(block, (max(dx, 0), max(dy, 0)))
+            return img
+        img = self._new(size)
+        for r in range(r0, r1):
+            row = self.grid[r]
+            for c in range(c0, c1):
+                img.paste(self.variants[row[c]], (dx + (c - c0) * cell_width, dy + (r - r0) * cell_height))
+        return img
+
+def random_cell_grid(rows, cols, weights):
+    """rows x cols variant indices drawn with the given weights, as nested lists"""
+    if np is not None:
+        p = np.asarray(weights, dtype=float)
+        return numpy_rng().choice(len(weights), size=(rows, cols), p=p / p.sum()).tolist()
+    return [random.choices(range(len(weights)), weights, k=cols) for _ in range(rows)]
+
+def create_geometric_pattern(width, height, colors, tiled=False):
+    """Create a geometric pattern background"""
+    draw = ShapeLayer(width, height, palette=colors)
+    
+    # Base color
+    base_color = random.choice(colors)
+    draw.rectangle([0, 0, width, height], fill=base_color)
+    
+    # Add random shapes
+    num_shapes = random.randint(10, 25)
+    for _ in range(num_shapes):
+        color = random.choice(colors)
+        x = random.randint(0, width)
+        y = random.randint(0, height)
+        size = random.randint(20, 100)
+        
+        if random.random() > 0.5:
+            # Circle
+            draw.ellipse([x-size, y-size, x+size, y+size], fill=color, outline=None)
+        else:
+            # Rectangle
+            draw.rectangle([x-size, y-size, x+size, y+size], fill=color, outline=None)
+    
+    return draw.render if tiled else draw.render()
+
+def create_organic_shapes(width, height, colors, tiled=False):
+    """Create organic, flowing shapes background"""
+    draw = ShapeLayer(width, height, palette=colors)
+    
+    # Base color
+    base_color = random.choice(colors)
+    draw.rectangle([0, 0, width, height], fill=base_color)
+    
+    # Create organic shapes using curves
+    for _ in range(random.randint(8, 15)):
+        color = random.choice(colors)
+        points = []
+        
+        # Generate random curve points
+        for _ in range(random.randint(4, 8)):
+            x = random.randint(0, width)
+            y = random.randint(0, height)
+            points.append((x, y))
+        
+        if len(points) >= 3:
+            # Draw filled polygon
+            draw.polygon(points, fill=color, outline=None)
+    
+    return draw.render if tiled else draw.render()
+
+def create_stripe_pattern(width, height, colors, tiled=False):
+    """Create a stripe pattern background"""
+    # Base color
+    base_color = random.choice(colors)
+    
+    # Stripe properties
+    stripe_width = random.randint(20, 60)
+    is_vertical = random.random() > 0.5
+    
+    # One square cell per stripe period and color; stripes are stripe_width + 1
+    # pixels wide, as ImageDraw's inclusive rectangles drew them
+    period = stripe_width * 2
+    stripe = [0, 0, stripe_width, period] if is_vertical else [0, 0, period, stripe_width]
+    variants = []
+    for index in range(len(colors)):
+        cell = indexed_image((period, period), colors, colors.index(base_color))
+        ImageDraw.Draw(cell).rectangle(stripe, fill=index)
+        variants.append(cell)
+    
+    # Each stripe's color runs its whole length
+    rows, cols = -(-height // period), -(-width // period)
+    weights = [1] * len(colors)
+    if is_vertical:
+        grid = random_cell_grid(1, cols, weights) * rows
+    else:
+        grid = [row * cols for row in random_cell_grid(rows, 1, weights)]
+    
+    pattern = CellPattern(variants, grid, (width, height))
+    return pattern.render if tiled else pattern.render()
+
+def create_dot_pattern(width, height, colors, tiled=False):
+    """Create a dot pattern background"""
+    # Base color
+    base_color = random.choice(colors)
+    
+    # Dot properties
+    dot_size = random.randint(4, 12)
+    spacing = dot_size * 3
+    
+    # A spacing-square cell centered on each dot holds it whole; variant 0 is no dot
+    half = spacing // 2
+    variants = [indexed_image((spacing, spacing), colors, colors.index(base_color))]
+    for index in range(len(colors)):
+        cell = variants[0].copy()
+        ImageDraw.Draw(cell).ellipse([half - dot_size, half - dot_size, half + dot_size, half + dot_size],
+                                     fill=index, outline=None)
+        variants.append(cell)
+    
+    # Dots sit at every multiple of spacing inside the canvas; 70% are drawn
+    rows, cols = len(range(spacing, height, spacing)), len(range(spacing, width, spacing))
+    grid = random_cell_grid(rows, cols, [0.3] + [0.7 / len(colors)] * len(colors))
+    
+    pattern = CellPattern(variants, grid, (width, height), origin=(spacing - half, spacing - half),
+                          background=colors.index(base_color))
+    return pattern.render if tiled else pattern.render()
+
+def create_wave_pattern(width, height, colors, tiled=False):
+    """Create a wave pattern background"""
+    draw = ShapeLayer(width, height, palette=colors)
+    
+    # Base color
+    base_color = random.choice(colors)
+    draw.rectangle([0, 0, width, height], fill=base_color)
+    
+    # Wave properties
+    wave_color = random.choice(colors)
+    wave_width = random.randint(2, 5)
+    
+    # Draw multiple wave lines
+    for i in range(random.randint(3, 7)):
+        points = []
+        for x in range(0, width, 5):
+            y = height // 2 + math.sin(x * 0.02 + i) * random.randint(30, 80)
+            points.append((x, y))
+        
+        if len(points) > 1:
+            draw.line(points, fill=wave_color, width=wave_width)
+    
+    return draw.render if tiled else draw.render()
+
+def create_checkerboard(width, height, colors, tiled=False):
+    """Create a checkerboard pattern background"""
+    square_size = random.randint(20, 60)
+    
+    # One solid square per color, picked at random for every cell
+    variants = [indexed_image((square_size, square_size), colors, index) for index in range(len(colors))]
+    grid = random_cell_grid(-(-height // square_size), -(-width // square_size), [1] * len(colors))
+    
+    pattern = CellPattern(variants, grid, (width, height))
+    return pattern.render if tiled else pattern.render()
+
+def create_spiral_pattern(width, height, colors, tiled=False):
+    """Create a spiral pattern background"""
+    draw = ShapeLayer(width, height, palette=colors)
+    
+    # Base color
+    base_color = random.choice(colors)
+    draw.rectangle([0, 0, width, height], fill=base_color)
+    
+    # Spiral properties
+    spiral_color = random.choice(colors)
+    center_x, center_y = width // 2, height // 2
+    
+    # Draw spiral
+    points = []
+    for angle in range(0, 3600, 10):  # 10 degree increments
+        radius = angle * 0.5
+        x = center_x + math.cos(math.radians(angle)) * radius
+        y = center_y + math.sin(math.radians(angle)) * radius
+        
+        if 0 <= x < width and 0 <= y < height:
+            points.append((x, y))
+    
+    if len(points) > 1:
+        draw.line(points, fill=spiral_color, width=3)
+    
+    return draw.render if tiled else draw.render()
+
+def numpy_rng():
+    """NumPy generator seeded from the global RNG, so per-asset seeding still applies"""
+    return np.random.default_rng(random.getrandbits(64))
+
+def lattice_permutation(rng):
+    """Random permutation table that hashes integer lattice points for the noise functions"""
+    return rng.permutation(256).astype(np.intp)
+
+def _lattice_hash(ix, iy, perm):
+    """Hash integer lattice coordinates to 0-255 (the lattice repeats every 256 cells)"""
+    return perm[(perm[ix & 255] + iy) & 255]
+
+def _fade(t):
+    """Perlin's quintic smoothstep 6t^5 - 15t^4 + 10t^3"""
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+def value_noise(x, y, perm):
+    """Value noise in [0, 1] at lattice coordinates x, y (arrays that broadcast together)
+    
+    Each lattice point gets a random value, blended smoothly across the cell.
+    """
+    ix, iy = np.floor(x).astype(np.intp), np.floor(y).astype(np.intp)
+    fx, fy = _fade(x - ix), _fade(y - iy)
+    corner = lambda dx, dy: _lattice_hash(ix + dx, iy + dy, perm) / np.float32(255)
+    top = corner(0, 0) + (corner(1, 0) - corner(0, 0)) * fx
+    bottom = corner(0, 1) + (corner(1, 1) - corner(0, 1)) * fx
+    return top + (bottom - top) * fy
+
+# 256 unit gradient vectors for perlin_noise, indexed by lattice hash
+_GRADIENT_ANGLES = np.arange(256) * (2 * math.pi / 256) if np is not None else None
+_GRADIENTS = (np.cos(_GRADIENT_ANGLES).astype(np.float32),
+              np.sin(_GRADIENT_ANGLES).astype(np.float32)) if np is not None else None
+
+def perlin_noise(x, y, perm):
+    """Gradient (Perlin) noise in [0, 1] at lattice coordinates x, y"""
+    ix, iy = np.floor(x).astype(np.intp), np.floor(y).astype(np.intp)
+    fx, fy = x - ix, y - iy
+    
+    def corner(dx, dy):
+        h = _lattice_hash(ix + dx, iy + dy, perm)
+        return _GRADIENTS[0][h] * (fx - dx) + _GRADIENTS[1][h] * (fy - dy)
+    
+    u, v = _fade(fx), _fade(fy)
+    top = corner(0, 0) + (corner(1, 0) - corner(0, 0)) * u
+    bottom = corner(0, 1) + (corner(1, 1) - corner(0, 1)) * u
+    # With unit gradients 2-D Perlin noise stays within +/- sqrt(1/2)
+    return np.clip(0.5 + (top + (bottom - top) * v) * np.float32(math.sqrt(0.5)), 0, 1)
+
+def fbm(noise, x, y, perm, octaves=4, persistence=0.5, lacunarity=2.0):
+    """Fractal Brownian motion: sum octaves of noise at rising frequency, normalized to [0, 1]"""
+    total = np.zeros(np.broadcast_shapes(np.shape(x), np.shape(y)), dtype=np.float32)
+    amplitude, frequency, weight = 1.0, 1.0, 0.0
+    for octave in range(octaves):
+        # Shift each octave so they don't all share the lattice origin
+        shift = octave * 17.31
+        total += np.float32(amplitude) * noise(x * frequency + shift, y * frequency + shift, perm)
+        weight += amplitude
+        amplitude *= persistence
+        frequency *= lacunarity
+    return total / np.float32(weight)
+
+def pixel_grid(width, height, cell, x0=0, y0=0):
+    """Lattice coordinates of pixel centers as a row (x) and a column (y) for broadcasting"""
+    x = (np.arange(x0, x0 + width, dtype=np.float32) + 0.5) / cell
+    y = (np.arange(y0, y0 + height, dtype=np.float32)[:, np.newaxis] + 0.5) / cell
+    return x, y
+
+def composite(base, layer, alpha):
+    """Alpha-blend layer over base; colors broadcast against an (H, W) alpha in [0, 1]"""
+    base = np.asarray(base, dtype=np.float32)
+    layer = np.asarray(layer, dtype=np.float32)
+    alpha = alpha[..., np.newaxis]
+    return np.clip(base + (layer - base) * alpha + 0.5, 0, 255).astype(np.uint8)
+
+# Kinds of texture create_noise_texture can make
+NOISE_MODES = ['speckle', 'value', 'perlin', 'fbm']
+
+# Speckle draws its dots from a fresh RNG per block of SPECKLE_BLOCK x
+# SPECKLE_BLOCK grid points, seeded by the block's position, so a tile
+# gets the same dots as the full frame without drawing the rest of it
+SPECKLE_BLOCK = 256
+
+def speckle_blocks(box):
+    """Yield (bx, by, grid box) for each speckle block overlapping a pixel box
+    
+    Speckle grid points sit on even pixel coordinates; the grid box is the
+    (left, top, right, bottom) range of those points inside both the block
+    and the pixel box.
+    """
+    left, top, right, bottom = box
+    gx0, gy0, gx1, gy1 = (left + 1) // 2, (top + 1) // 2, (right + 1) // 2, (bottom + 1) // 2
+    for by in range(gy0 // SPECKLE_BLOCK, -(-gy1 // SPECKLE_BLOCK)):
+        for bx in range(gx0 // SPECKLE_BLOCK, -(-gx1 // SPECKLE_BLOCK)):
+            x0, y0 = bx * SPECKLE_BLOCK, by * SPECKLE_BLOCK
+            yield bx, by, (max(gx0, x0), max(gy0, y0),
+                           min(gx1, x0 + SPECKLE_BLOCK), min(gy1, y0 + SPECKLE_BLOCK))
+
+def create_noise_texture(width, height, colors, mode=None, octaves=5, tiled=False):
+    """Create a noise texture background
+    
+    'speckle' scatters translucent palette-colored dots over the base color
+    on a 2px grid; 'value' and 'perlin' blend a second palette color in
+    through a smooth noise field, and 'fbm' layers `octaves` of Perlin
+    noise for paper and grain textures. mode=None picks one at random.
+    """
+    if mode is None:
+        mode = random.choice(NOISE_MODES)
+    
+    # Base color
+    base_color = random.choice(colors)
+    
+    if np is None:
+        seed = random.getrandbits(64)
+        render = lambda box: _create_noise_texture_pil(box, colors, base_color, seed)
+        return render if tiled else render((0, 0, width, height))
+    
+    if mode == 'speckle':
+        seed = random.getrandbits(64)
+        palette = np.asarray(colors, dtype=np.uint8)
+        shape = (SPECKLE_BLOCK, SPECKLE_BLOCK)
+        
+        def render(box):
+            # 30% of the points on a 2px grid get a palette color at alpha 50-200
+            left, top, right, bottom = box
+            alpha = np.zeros((bottom - top, right - left), dtype=np.float32)
+            layer = np.zeros((bottom - top, right - left, 3), dtype=np.uint8)
+            for bx, by, (x0, y0, x1, y1) in speckle_blocks(box):
+                block = np.random.default_rng([seed, by, bx])
+                mask = block.random(shape) > 0.7
+                strength = block.integers(50, 201, shape) / 255
+                index = block.integers(0, len(colors), shape)
+                cells = (slice(y0 - by * SPECKLE_BLOCK, y1 - by * SPECKLE_BLOCK),
+                         slice(x0 - bx * SPECKLE_BLOCK, x1 - bx * SPECKLE_BLOCK))
+                pixels = (slice(2 * y0 - top, 2 * y1 - top, 2), slice(2 * x0 - left, 2 * x1 - left, 2))
+                alpha[pixels] = np.where(mask[cells], strength[cells], 0)
+                layer[pixels] = palette[index[cells]]
+            return Image.fromarray(composite(base_color, layer, alpha))
+        return render if tiled else render((0, 0, width, height))
+    
+    rng = numpy_rng()
+    perm = lattice_permutation(rng)
+    cell = random.choice([24, 48, 96]) * max(width // 800, 1)
+    grain_color = random.choice([color for color in colors if color != base_color] or colors)
+    strength = random.uniform(0.4, 0.9)
+    
+    def render(box):
+        left, top, right, bottom = box
+        x, y = pixel_grid(right - left, bottom - top, cell, left, top)
+        if mode == 'value':
+            field = value_noise(x, y, perm)
+        elif mode == 'perlin':
+            field = perlin_noise(x, y, perm)
+        else:
+            field = fbm(perlin_noise, x, y, perm, octaves=octaves)
+        return Image.fromarray(composite(base_color, grain_color, field * np.float32(strength)))
+    return render if tiled else render((0, 0, width, height))
+
+def _create_noise_texture_pil(box, colors, base_color, seed):
+    """Per-point speckle texture of one box, used when NumPy is not installed"""
+    left, top, right, bottom = box
+    img = Image.new('RGB', (right - left, bottom - top), base_color)
+    # An RGBA draw context blends each point's alpha into the RGB image
+    draw = ImageDraw.Draw(img, 'RGBA')
+    
+    # Add noise, replaying each block's draws in order and keeping those in the box
+    for bx, by, (x0, y0, x1, y1) in speckle_blocks(box):
+        block = random.Random(f"{seed}:{by}:{bx}")
+        for gx in range(bx * SPECKLE_BLOCK, (bx + 1) * SPECKLE_BLOCK):
+            for gy in range(by * SPECKLE_BLOCK, (by + 1) * SPECKLE_BLOCK):
+                if block.random() > 0.7:  # 30% chance to add noise
+                    color = block.choice(colors)
+                    intensity = block.randint(50, 200)
+                    if x0 <= gx < x1 and y0 <= gy < y1:
+                        draw.point((2 * gx - left, 2 * gy - top), fill=(color[0], color[1], color[2], intensity))
+    
+    return img
+
+def turbulence_noise(x, y, perm):
+    """Folded Perlin noise |2n - 1|; summed over octaves it gives marble turbulence"""
+    return np.abs(perlin_noise(x, y, perm) * 2 - 1)
+
+# Edge length of the square tiles marble is rendered in; bounds the float working set
+TILE_SIZE = 512
+
+def marble_params(width, height, colors):
+    """Pick everything a marble render needs, as a picklable dict for tile workers"""
+    scale = max(width, height) / 800
+    angle = math.radians(random.uniform(0, 180))
+    period = random.uniform(90, 220) * scale
+    base, vein, accent = random.sample(colors, 3)
+    # Mostly base color, fading through the accent into thin vein lines
+    stops = [base, base, accent, vein]
+    return {
+        'perm': lattice_permutation(numpy_rng()),
+        'wave_x': math.cos(angle) * 2 * math.pi / period,
+        'wave_y': math.sin(angle) * 2 * math.pi / period,
+        'cell': random.uniform(120, 260) * scale,
+        'power': random.uniform(4, 9),
+        'octaves': 5,
+        'sharpness': random.uniform(2, 5),
+        'lut': interpolate_color_array(stops, np.linspace(0, 1, 256)),
+    }
+
+def render_marble_tile(params, box):
+    """Render the (left, top, right, bottom) box of a marble texture as an RGB array
+    
+    Every value is a function of global pixel coordinates, so tiles rendered
+    separately (or in other processes) line up without seams.
+    """
+    left, top, right, bottom = box
+    x, y = pixel_grid(right - left, bottom - top, params['cell'], left, top)
+    turbulence = fbm(turbulence_noise, x, y, params['perm'], octaves=params['octaves'])
+    # The vein phase in pixel units, bent by turbulence
+    phase = (x * params['wave_x'] + y * params['wave_y']) * params['cell']
+    veins = np.abs(np.sin(phase + turbulence * params['power']))
+    # Raise the folded sine so most of the surface stays near the base color
+    level = 1 - veins ** (1 / params['sharpness'])
+    return params['lut'][(level * 255).astype(np.uint8)]
+
+def tile_boxes(width, height, tile_size=TILE_SIZE):
+    """Split a canvas into (left, top, right, bottom) tiles in row-major order"""
+    return [(left, top, min(left + tile_size, width), min(top + tile_size, height))
+            for top in range(0, height, tile_size)
+            for left in range(0, width, tile_size)]
+
+def create_marble_texture(width, height, colors, tile_size=TILE_SIZE, executor=None, tiled=False):
+    """Create a marble texture background from sine-of-turbulence veins
+    
+    The texture is rendered tile by tile, so the float working set stays
+    bounded by tile_size no matter how large the canvas is. Pass an
+    executor (e.g. a ProcessPoolExecutor) to render tiles in parallel.
+    """
+    if np is None:
+        layer = _create_marble_texture_pil(width, height, colors)
+        return layer.render if tiled else layer.render()
+    
+    params = marble_params(width, height, colors)
+    if tiled:
+        return lambda box: Image.fromarray(render_marble_tile(params, box))
+    boxes = tile_boxes(width, height, tile_size)
+    img = Image.new('RGB', (width, height))
+    tiles = executor.map(render_marble_tile, [params] * len(boxes), boxes) if executor else \
+        (render_marble_tile(params, box) for box in boxes)
+    for box, tile in zip(boxes, tiles):
+        img.paste(Image.fromarray(tile), box[:2])
+    return img
+
+def _create_marble_texture_pil(width, height, colors):
+    """Random vein polylines used when NumPy is not installed, as a ShapeLayer"""
+    draw = ShapeLayer(width, height)
+    
+    # Base color
+    base_color = random.choice(colors)
+    draw.rectangle([0, 0, width, height], fill=base_color)
+    
+    # Add marble veins
+    for _ in range(random.randint(5, 15)):
+        color = random.choice(colors)
+        start_x = random.randint(0, width)
+        start_y = random.randint(0, height)
+        
+        points = [(start_x, start_y)]
+        for _ in range(random.randint(3, 8)):
+            x = start_x + random.randint(-50, 50)
+            y = start_y + random.randint(-50, 50)
+            if 0 <= x < width and 0 <= y < height:
+                points.append((x, y))
+        
+        if len(points) > 1:
+            draw.line(points, fill=color, width=random.randint(1, 3))
+    
+    return draw
+
+# Darkness of the vignette at the very edge, matching the builder's
+# `inset 0 0 Vpx V/2px rgba(0,0,0,.25)` box-shadow
+VIGNETTE_STRENGTH = 0.25
+
+def vignette_profile(start, stop, length, size):
+    """Unshadowed fraction of pixels start..stop along an edge `length` long
+    
+    The builder draws its vignette as an inset box-shadow with blur `size`
+    and spread size/2, i.e. a rectangle inset by size/2 blurred with sigma
+    size/2. That blur is separable, so the 2-D coverage is the product of
+    one profile per axis.
+    """
+    sigma = spread = size / 2
+    scale = 1 / (sigma * math.sqrt(2))
+    return [0.5 * (math.erf((x + 0.5 - spread) * scale) - math.erf((x + 0.5 - length + spread) * scale))
+            for x in range(start, stop)]
+
+# Float32 scratch array apply_effects reuses for every image a process renders
+_scratch = None
+
+def scratch_buffer(count):
+    """The process's float32 scratch array, grown to at least count items"""
+    global _scratch
+    if _scratch is None or _scratch.size < count:
+        _scratch = np.empty(count, dtype=np.float32)
+    return _scratch
+
+def apply_effects(img, brightness=1.0, contrast=1.0, vignette=0, box=None, size=None, buffer=None):
+    """Apply brightness, contrast and a vignette to an RGB image in one fused pass
+    
+    Brightness and contrast (about mid-gray, like the CSS filters) fold into
+    one gain and offset, and the vignette scales both, so every pixel costs
+    a single multiply-add. box is img's position on a canvas of `size`, so a
+    tile gets its own slice of the vignette; buffer is a float32 scratch
+    array reused between calls (default: the process's scratch_buffer).
+    Without a vignette this is a lookup table.
+    """
+    if brightness == 1.0 and contrast == 1.0 and not vignette:
+        return img
+    gain = brightness * contrast
+    offset = 128 * (1 - contrast)
+    if not vignette:
+        lut = [min(max(int(v * gain + offset + 0.5), 0), 255) for v in range(256)]
+        return img.point(lut * 3)
+    
+    left, top = box[:2] if box else (0, 0)
+    width, height = size or img.size
+    columns = vignette_profile(left, left + img.width, width, vignette)
+    rows = vignette_profile(top, top + img.height, height, vignette)
+    if np is None:
+        return _apply_effects_pil(img, gain, offset, columns, rows)
+    
+    shade = 1 - VIGNETTE_STRENGTH * (1 - np.outer(np.float32(rows), np.float32(columns)))
+    count = img.height * img.width * 3
+    if buffer is None or buffer.size < count:
+        buffer = scratch_buffer(count)
+    work = buffer[:count].reshape(img.height, img.width, 3)
+    work[...] = np.asarray(img)
+    work *= (shade * gain)[..., np.newaxis]
+    work += (shade * offset + 0.5)[..., np.newaxis]
+    np.clip(work, 0, 255, out=work)
+    return Image.fromarray(work.astype(np.uint8))
+
+def _apply_effects_pil(img, gain, offset, columns, rows):
+    """apply_effects without NumPy: a lookup table, then a multiplied shade mask"""
+    img = img.point([min(max(int(v * gain + offset + 0.5), 0), 255) for v in range(256)] * 3)
+    across = Image.new('L', (len(columns), 1))
+    across.putdata([round(v * 255) for v in columns])
+    down = Image.new('L', (1, len(rows)))
+    down.putdata([round(v * 255) for v in rows])
+    covered = ImageChops.multiply(across.resize(img.size), down.resize(img.size))
+    shade = covered.point(lambda v: round(255 - VIGNETTE_STRENGTH * (255 - v)))
+    return ImageChops.multiply(img, Image.merge('RGB', (shade, shade, shade)))
+
+# Stage timings of the background being generated; a list only while profiling
+_stage_times = None
+
+@contextmanager
+def stage(name):
+    """Record the wall and CPU time of a stage when profiling is on
+
+    A stage entered several times (once per tile in tiled mode) gets a
+    record each time; with profiling off this costs one check.
+    """
+    if _stage_times is None:
+        yield
+        return
+    start, wall, cpu = time.time(), time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        _stage_times.append({'stage': name, 'start': start, 'wall': time.perf_counter() - wall,
+                             'cpu': time.process_time() - cpu, 'pid': os.getpid()})
+
+def needs_rgb(blur=0, brightness=1.0, vignette=0, contrast=1.0):
+    """Whether these effects have to work on RGB pixels rather than palette indices"""
+    return bool(blur or brightness != 1.0 or contrast != 1.0 or vignette)
+
+def blur_margin(radius):
+    """Pixels of context a tile needs on each side to blur like the full frame"""
+    # PIL approximates the Gaussian with three box blurs, about 3 sigma wide in all
+    return int(math.ceil(radius * 3)) + 4 if radius else 0
+
+def render_tiled(render, width, height, blur=0, brightness=1.0, vignette=0, contrast=1.0, tile_size=TILE_SIZE):
+    """Render a tiled generator with effects, yielding full-width bands top to bottom
+    
+    render(box) is what a generator returns with tiled=True. Each tile is
+    drawn with a blur margin, blurred, cropped back and run through
+    apply_effects on its own, so the bands match a full-frame render while
+    memory holds only one band of tiles at a time. The one exception is
+    polygons crossing a tile: Pillow rounds their edges from the shifted
+    coordinates, so now and then a single edge pixel differs. Indexed (P) tiles stay
+    indexed unless an effect needs RGB, and so do their bands.
+    """
+    margin = blur_margin(blur)
+    buffer = scratch_buffer(tile_size * tile_size * 3) if np is not None else None
+    promote = needs_rgb(blur, brightness, vignette, contrast)
+    for top in range(0, height, tile_size):
+        bottom = min(top + tile_size, height)
+        band = None
+        for left in range(0, width, tile_size):
+            right = min(left + tile_size, width)
+            # Clamping the margin at the canvas edge matches PIL's edge handling
+            outer = (max(left - margin, 0), max(top - margin, 0),
+                     min(right + margin, width), min(bottom + margin, height))
+            with stage('render'):
+                tile = render(outer)
+            with stage('effects'):
+                if promote and tile.mode == 'P':
+                    tile = tile.convert('RGB')
+                if blur:
+                    tile = tile.filter(ImageFilter.GaussianBlur(radius=blur))
+                tile = tile.crop((left - outer[0], top - outer[1], right - outer[0], bottom - outer[1]))
+                tile = apply_effects(tile, brightness, contrast, vignette=vignette, box=(left, top),
+                                     size=(width, height), buffer=buffer)
+            if band is None:
+                band = Image.new(tile.mode, (width, bottom - top))
+                if tile.mode == 'P':
+                    band.putpalette(tile.getpalette())
+            band.paste(tile, (left, 0))
+        yield band
+
+# |b| of each byte b read as a signed residual, for PNG filter selection
+_RESIDUAL_COST = np.minimum(np.arange(256), 256 - np.arange(256)).astype(np.uint8) if np is not None else None
+
+class PNGWriter:
+    """Write an RGB or indexed (P) PNG one horizontal band at a time
+    
+    PIL can only save whole images, so rows are filtered and deflated here;
+    memory use is one band no matter how tall the image is. The first
+    band's mode picks the color type, and a P band's palette is written
+    as the PNG's.
+    """
+    
+    def __init__(self, path, width, height, level=6):
+        self.file = open(path, 'wb')
+        self.compressor = zlib.compressobj(level)
+        self.size = (width, height)
+        self.pixel = None  # bytes per pixel, set by the first band
+        self.previous = None
+        self.file.write(b'\x89PNG\r\n\x1a\n')
+    
+    def _header(self, band):
+        width, height = self.size
+        indexed = band.mode == 'P'
+        self.pixel = 1 if indexed else 3
+        self.stride = width * self.pixel
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3 if indexed else 2, 0, 0, 0))
+        if indexed:
+            self._chunk(b'PLTE', bytes(band.getpalette()))
+    
+    def _chunk(self, kind, data):
+        self.file.write(struct.pack('>I', len(data)) + kind + data)
+        self.file.write(struct.pack('>I', zlib.crc32(kind + data)))
+    
+    def _filter(self, band):
+        """Prefix each row with its PNG filter type, picking None, Sub or Up per row"""
+        if np is None:
+            raw = band.tobytes()
+            return b''.join(b'\x00' + raw[i:i + self.stride] for i in range(0, len(raw), self.stride))
+        rows = np.asarray(band, dtype=np.uint8).reshape(band.height, self.stride)
+        above = np.empty_like(rows)
+        above[0] = self.previous if self.previous is not None else 0
+        above[1:] = rows[:-1]
+        left = np.zeros_like(rows)
+        left[:, self.pixel:] = rows[:, :-self.pixel]
+        candidates = np.stack([rows, rows - left, rows - above])
+        self.previous = rows[-1].copy()
+        # The usual heuristic: smallest sum of bytes read as signed residuals
+        cost = np.stack([_RESIDUAL_COST[candidate].sum(axis=1, dtype=np.uint32)
+                         for candidate in candidates])
+        choice = cost.argmin(axis=0)
+        out = np.empty((band.height, self.stride + 1), dtype=np.uint8)
+        out[:, 0] = choice
+        out[:, 1:] = candidates[choice, np.arange(band.height)]
+        return out.tobytes()
+    
+    def write_band(self, band):
+        if self.pixel is None:
+            self._header(band)
+        data = self.compressor.compress(self._filter(band))
+        if data:
+            self._chunk(b'IDAT', data)
+    
+    def close(self):
+        self._chunk(b'IDAT', self.compressor.flush())
+        self._chunk(b'IEND', b'')
+        self.file.close()
+
+# Background generators, in the order backgrounds.GENERATOR_NAMES lists them
+generators = [globals()[name] for name in GENERATOR_NAMES]
+
+# Sizes written for every background as fractions of the 800x600 base canvas,
+# largest first. 'print' is the render itself and only exists when scale > 1.
+RESOLUTION_LADDER = [('full', 1), ('preview', 1 / 2), ('thumb', 1 / 4)]
+LADDER_SUFFIXES = {'print': '-print', 'full': '', 'preview': '-preview', 'thumb': '-thumb'}
+
+def ladder_sizes(scale):
+    """List (rung, (width, height)) for one background rendered at scale, largest first"""
+    sizes = [('print', (800 * scale, 600 * scale))] if scale > 1 else []
+    sizes += [(rung, (round(800 * fraction), round(600 * fraction)))
+              for rung, fraction in RESOLUTION_LADDER]
+    return sizes
+
+# Directions used for linear gradients (see create_gradient_background)
+GRADIENT_ANGLES = [90, 0, 45, 135]
+
+# Lossy qualities tried per format, lowest first; the first that passes wins
+LOSSY_QUALITIES = [60, 70, 80, 90, 95]
+
+EXTENSIONS = {'PNG': 'png', 'JPEG': 'jpg', 'WEBP': 'webp'}
+
+def encode_image(img, fmt, options, palette=False):
+    """Encode an image to bytes; palette=True stores a 256-color indexed PNG
+    
+    A P image keeps its own palette, trimmed to the colors it uses so a
+    two-color pattern gets 1-bit pixels, or is saved as RGB when
+    palette=False.
+    """
+    buffer = io.BytesIO()
+    if palette and img.mode == 'P':
+        source = img.remap_palette(sorted(index for _, index in img.getcolors(256)))
+    elif palette:
+        source = img.quantize(256)
+    else:
+        source = img.convert('RGB') if img.mode == 'P' else img
+    source.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+def psnr(original, data, reference=None):
+    """Peak signal-to-noise ratio (dB) of encoded bytes against the original image
+    
+    reference may hold the original as a NumPy array to save converting it
+    again for every candidate.
+    """
+    decoded = Image.open(io.BytesIO(data)).convert('RGB')
+    if np is not None:
+        if reference is None:
+            reference = np.asarray(original, dtype=np.int16)
+        diff = reference - np.asarray(decoded, dtype=np.int16)
+        mse = float(np.mean(np.square(diff, dtype=np.int32)))
+    else:
+        # rms of the difference per band is sqrt(MSE) for that band
+        mse = sum(rms * rms for rms in ImageStat.Stat(ImageChops.difference(original, decoded)).rms) / 3
+    if mse == 0:
+        return float('inf')
+    return 10 * math.log10(255 ** 2 / mse)
+
+# Lossless candidates as (label, format, fast options used while searching,
+# options used for the final files, palettize)
+LOSSLESS_CANDIDATES = [
+    ('webp-lossless', 'WEBP', {'lossless': True, 'method': 0}, {'lossless': True, 'method': 4}, False),
+    ('png8', 'PNG', {}, {'optimize': True}, True),
+    ('png', 'PNG', {}, {'optimize': True}, False),
+]
+
+def choose_encoding(img, min_psnr=DEFAULT_MIN_PSNR):
+    """Find the smallest encoding of img that stays above min_psnr
+    
+    Lossless WebP and PNG always qualify; a palettized PNG qualifies when
+    256 colors are enough (flat patterns usually have far fewer). Lossless
+    candidates are ranked with fast encoder settings and only the winner
+    is written with the slow, tighter ones.
+    
+    For lossy WebP and JPEG the lowest quality is probed first: if it is
+    already bigger than the best file so far the format can't win, and if
+    it passes it is the answer. Otherwise the lowest passing quality is
+    binary-searched. Returns the winner plus the byte size of every
+    candidate tried.
+    
+    A P image is its own exact palettized PNG; the other candidates encode
+    it as RGB.
+    """
+    indexed = img.mode == 'P'
+    original, img = img, img.convert('RGB') if indexed else img
+    reference = np.asarray(img, dtype=np.int16) if np is not None else None
+    best = None
+    sizes = {}
+    
+    for label, fmt, search_options, options, palette in LOSSLESS_CANDIDATES:
+        data = encode_image(original if palette else img, fmt, search_options, palette)
+        sizes[label] = len(data)
+        if best is not None and len(data) >= best['bytes']:
+            continue
+        quality_db = psnr(img, data, reference) if palette and not indexed else float('inf')
+        if quality_db >= min_psnr:
+            best = {'label': label, 'format': fmt, 'options': options, 'palette': palette,
+                    'psnr': quality_db, 'bytes': len(data)}
+    
+    for fmt in ('WEBP', 'JPEG'):
+        low, high = 0, len(LOSSY_QUALITIES) - 1
+        while low <= high:
+            middle = 0 if low == 0 else (low + high) // 2
+            quality = LOSSY_QUALITIES[middle]
+            options = {'quality': quality, 'optimize': True} if fmt == 'JPEG' else {'quality': quality}
+            label = f"{fmt.lower()}-q{quality}"
+            data = encode_image(img, fmt, options)
+            sizes[label] = len(data)
+            if len(data) >= best['bytes']:
+                high = middle - 1  # only a lower quality could still win
+                continue
+            quality_db = psnr(img, data, reference)
+            if quality_db >= min_psnr:
+                best = {'label': label, 'format': fmt, 'options': options, 'palette': False,
+                        'psnr': quality_db, 'bytes': len(data)}
+                high = middle - 1
+            else:
+                low = middle + 1
+    
+    best['candidates'] = sizes
+    return best
+
+def generate_background(index, scale=1, min_psnr=DEFAULT_MIN_PSNR, tiled=False, effects=None,
+                        output_dir=BACKGROUNDS_DIR):
+    """Generate a single background image
+    
+    Returns the ladder of written files and the encoding report for the
+    full-size rung; each file also records the encoding chosen for it.
+    With tiled=True the render never exists as one full-size image: it is
+    built band by band (see render_tiled) and the print rung is streamed
+    to a PNG, so memory stays flat however large the scale. effects
+    (see backgrounds.config_effects) are baked in on top of the random variation.
+    """
+    width, height = 800 * scale, 600 * scale
+    
+    # Select random generator and colors, exactly as plan_background() did
+    name, colors = choose_style()
+    generator = globals()[name]
+    
+    # Generate the image, or a tile renderer for it
+    with stage('render'):
+        if generator == create_gradient_background:
+            img = generator(width, height, random.sample(colors, random.randint(2, 3)),
+                            angle=random.choice(GRADIENT_ANGLES), tiled=tiled)
+        elif generator == create_radial_gradient:
+            img = generator(width, height, random.sample(colors, random.randint(2, 3)), tiled=tiled)
+        else:
+            img = generator(width, height, colors, tiled=tiled)
+    
+    # Pick some random effects: a blur and a brightness adjustment
+    blur = random.uniform(0.5, 2.0) * scale if random.random() > 0.5 else 0
+    brightness = random.uniform(0.8, 1.2) if random.random() > 0.7 else 1.0
+    vignette = 0
+    contrast = 1.0
+    if effects:
+        # Gaussian blurs compose in quadrature; sizes are in 800x600 pixels
+        blur = math.hypot(blur, effects['blur'] * scale)
+        brightness *= effects['brightness']
+        vignette = effects['vignette'] * scale
+        contrast = effects.get('contrast', 1.0)
+    
+    variants = []
+    if tiled:
+        # Box-reduce each band into the full-size rung as it goes by
+        render, img = img, None
+        writer = None
+        if scale > 1:
+            filename = f"bg-{index:03d}{LADDER_SUFFIXES['print']}.png"
+            writer = PNGWriter(os.path.join(output_dir, filename), width, height)
+            variants.append({'rung': 'print', 'file': filename, 'width': width, 'height': height,
+                             'encoding': 'png'})
+        top = 0
+        for band in render_tiled(render, width, height, blur, brightness, vignette, contrast):
+            if writer:
+                # Filtering and deflating dominate; the PNG goes out as it is deflated
+                with stage('encode'):
+                    writer.write_band(band)
+            with stage('resize'):
+                if scale > 1:
+                    # Box filtering blends colors, so reduced bands are RGB
+                    reduced = (band.convert('RGB') if band.mode == 'P' else band).reduce(scale)
+                else:
+                    reduced = band
+                if img is None:
+                    img = Image.new(reduced.mode, (800, 600))
+                    if reduced.mode == 'P':
+                        img.putpalette(reduced.getpalette())
+                img.paste(reduced, (0, top // scale))
+            top += band.height
+        if writer:
+            with stage('encode'):
+                writer.close()
+            if writer.pixel == 1:
+                variants[-1]['encoding'] = 'png8'
+    else:
+        with stage('effects'):
+            # Indexed renders stay indexed unless an effect needs real colors
+            if img.mode == 'P' and needs_rgb(blur, brightness, vignette, contrast):
+                img = img.convert('RGB')
+            if blur:
+                img = img.filter(ImageFilter.GaussianBlur(radius=blur))
+            img = apply_effects(img, brightness, contrast, vignette=vignette)
+    
+    # Walk down the ladder, resizing each rung from the one above it
+    rungs = []
+    for rung, size in ladder_sizes(scale):
+        if tiled and rung == 'print':
+            continue
+        if img.size != size:
+            with stage('resize'):
+                # Resampling blends colors, so resized rungs are RGB
+                img = img.convert('RGB') if img.mode == 'P' else img
+                img = img.resize(size, Image.LANCZOS, reducing_gap=2.0)
+        rungs.append((rung, img))
+    
+    # Each rung gets its own smallest encoding: downscaling adds antialiased
+    # colors, so what suits the full size rarely suits the thumbnail. The
+    # print rung reuses the full-size choice rather than searching at 16x cost,
+    # unless it is still indexed: then its own palette is exact and smallest.
+    with stage('encode'):
+        encodings = {rung: choose_encoding(img, min_psnr) for rung, img in rungs if rung != 'print'}
+    encodings['print'] = encodings['full']
+    if rungs[0][0] == 'print' and rungs[0][1].mode == 'P':
+        encodings['print'] = {'label': 'png8', 'format': 'PNG', 'options': {'optimize': True}, 'palette': True}
+    for rung, img in rungs:
+        encoding = encodings[rung]
+        filename = f"bg-{index:03d}{LADDER_SUFFIXES[rung]}.{EXTENSIONS[encoding['format']]}"
+        with stage('encode'):
+            data = encode_image(img, encoding['format'], encoding['options'], encoding['palette'])
+        with stage('write'):
+            with open(os.path.join(output_dir, filename), 'wb') as f:
+                f.write(data)
+        variants.append({'rung': rung, 'file': filename, 'width': img.width, 'height': img.height,
+                         'encoding': encoding['label']})
+        if rung == 'full':
+            encoding['bytes'] = len(data)  # the search may have used faster settings
+    
+    return variants, encodings['full']
+
+def _generate_task(task):
+    """Worker entry point: seed the RNG for one index and render it
+    
+    Seeding per index rather than per worker keeps every file identical no
+    matter how many workers share the run. Errors are returned, not raised,
+    so one bad background doesn't abort the rest of the batch. With
+    profiling on, the stage records come back too, and cprofile_dir gets a
+    cProfile dump per background.
+    """
+    global _stage_times
+    index, seed, scale, min_psnr, tiled, effects, output_dir, profile, cprofile_dir = task
+    _stage_times = [] if profile else None
+    profiler = cProfile.Profile() if cprofile_dir else None
+    random.seed(seed)
+    try:
+        if profiler:
+            profiler.enable()
+        with stage('total'):
+            result = generate_background(index, scale=scale, min_psnr=min_psnr, tiled=tiled,
+                                         effects=effects, output_dir=output_dir)
+        return index, result, None, _stage_times
+    except Exception as e:
+        return index, None, str(e), _stage_times
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(cprofile_dir, f"bg-{index:03d}.prof"))
+        _stage_times = None
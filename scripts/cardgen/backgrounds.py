@@ -0,0 +1,335 @@
+"""
+Generate 160 background images for event cards
+
+Planning a run, the build manifests and the command line live here and
+need only the standard library, so --help, listing and a run with
+nothing to rebuild never import PIL. The drawing itself is in
+background_render, loaded once some background actually needs it.
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from .common import (ELEMENTS_CONFIG_PATH, asset_seed, file_digest, load_elements_config,
+                     load_manifest, save_manifest)
+
+# Where backgrounds are written, relative to the project root
+BACKGROUNDS_DIR = "backgrounds"
+
+# Color palettes
+color_palettes = [
+    # Warm colors
+    [(255, 107, 107), (78, 205, 196), (69, 183, 209), (150, 206, 180), (255, 234, 167)],
+    # Cool colors
+    [(108, 92, 231), (162, 155, 254), (253, 121, 168), (116, 185, 255), (9, 132, 227)],
+    # Earth tones
+    [(225, 112, 85), (253, 203, 110), (0, 184, 148), (0, 206, 201), (116, 185, 255)],
+    # Pastels
+    [(168, 230, 207), (220, 237, 193), (255, 211, 182), (255, 182, 193), (255, 203, 110)],
+    # Vibrant
+    [(255, 217, 61), (255, 107, 107), (255, 142, 142), (108, 92, 231), (162, 155, 254)],
+    # Monochrome
+    [(45, 52, 54), (52, 73, 94), (74, 85, 104), (99, 110, 114), (116, 125, 136)],
+    # Sunset
+    [(255, 107, 107), (255, 159, 67), (255, 203, 110), (255, 142, 142), (253, 121, 168)],
+    # Ocean
+    [(0, 184, 148), (0, 206, 201), (116, 185, 255), (9, 132, 227), (45, 52, 54)]
+]
+
+# Background generators by function name (see background_render), in the
+# order choose_style() picks from; names are enough to plan a run
+GENERATOR_NAMES = [
+    'create_gradient_background',
+    'create_radial_gradient',
+    'create_geometric_pattern',
+    'create_organic_shapes',
+    'create_stripe_pattern',
+    'create_dot_pattern',
+    'create_wave_pattern',
+    'create_checkerboard',
+    'create_spiral_pattern',
+    'create_noise_texture',
+    'create_marble_texture'
+]
+
+# Canvas multipliers for print-quality output (1x is the 800x600 preview)
+PRINT_SCALES = [1, 2, 4]
+
+# Lowest PSNR (dB) a lossy encoding may have against the rendered image
+DEFAULT_MIN_PSNR = 40.0
+
+def choose_style():
+    """Pick the generator name and palette for a background from the current RNG state
+    
+    The only copy: plan_background() hashes its picks and the renderer
+    draws from them, so the two can never disagree.
+    """
+    return random.choice(GENERATOR_NAMES), random.choice(color_palettes)
+
+# Number of backgrounds produced by a full run
+TOTAL_BACKGROUNDS = 160
+
+# Name mixed into per-asset seeds so backgrounds and decorations never share a stream
+GENERATOR_NAME = "backgrounds"
+
+# Bump whenever rendering, effects or encoding change so the manifest rebuilds everything
+GENERATOR_VERSION = 10
+
+# Build manifest kept next to the outputs (see plan_background)
+MANIFEST_NAME = ".build-manifest.json"
+
+# Public listing of every background's resolution ladder, for the builder UI
+LADDER_MANIFEST_NAME = "backgrounds.json"
+
+def config_effects(name, path=ELEMENTS_CONFIG_PATH):
+    """The default effects of one configured background, in generator units
+    
+    defaultBlur and defaultVignette are CSS pixels, defaultBrightness and
+    defaultContrast percentages; baking them in lets the builder skip its
+    CSS filters.
+    """
+    entry = load_elements_config(path)['backgrounds'][name]
+    return {
+        'blur': entry.get('defaultBlur', 0),
+        'brightness': entry.get('defaultBrightness', 100) / 100,
+        'vignette': entry.get('defaultVignette', 0),
+        'contrast': entry.get('defaultContrast', 100) / 100,
+    }
+
+def plan_background(master_seed, index, scale, min_psnr=DEFAULT_MIN_PSNR, tiled=False, effects=None):
+    """Describe everything that determines one background's output
+    
+    After the seed, only the generator and palette picks feed the render,
+    so hashing these parameters tells us whether the file would change
+    without having to draw it.
+    """
+    seed = asset_seed(GENERATOR_NAME, master_seed, index)
+    random.seed(seed)
+    generator, colors = choose_style()
+    params = {
+        'seed': seed,
+        'generator': generator,
+        'colors': [list(color) for color in colors],
+        'scale': scale,
+        'min_psnr': min_psnr,
+        'tiled': tiled,
+        'effects': effects,
+        'version': GENERATOR_VERSION,
+    }
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return params, digest
+
+def is_up_to_date(entry, input_hash, output_dir=BACKGROUNDS_DIR):
+    """True if a manifest entry was built from input_hash and its files are still intact"""
+    if not entry or entry.get('input_hash') != input_hash:
+        return False
+    try:
+        return all(os.path.getsize(os.path.join(output_dir, variant['file'])) == variant['size']
+                   for variant in entry['variants'])
+    except (OSError, KeyError):
+        return False
+
+def write_ladder_manifest(path, assets):
+    """Write the public list of sizes per background so the UI can pick the smallest adequate one
+    
+    Backgrounds built with --bake-effects are also listed under "effects",
+    so the UI knows not to apply those CSS filters a second time.
+    """
+    backgrounds = {}
+    baked = {}
+    for index in sorted(assets, key=int):
+        entry = assets[index]
+        name = f"bg-{int(index):03d}"
+        backgrounds[name] = {
+            variant['rung']: {key: variant[key] for key in ('file', 'width', 'height', 'size')}
+            for variant in entry['variants']
+        }
+        if entry['params'].get('effects'):
+            baked[name] = entry['params']['effects']
+    listing = {'backgrounds': backgrounds}
+    if baked:
+        listing['effects'] = baked
+    save_manifest(path, listing)
+
+# Stages reported by --profile, in pipeline order
+PROFILE_STAGES = ['render', 'effects', 'resize', 'encode', 'write']
+
+def write_profile(path, records):
+    """Write stage records as a Chrome trace when path ends in .json, else as JSON lines
+    
+    Traces open in chrome://tracing or Perfetto, one row per worker process.
+    """
+    with open(path, 'w', newline='\n') as f:
+        if not path.endswith('.json'):
+            for record in records:
+                f.write(json.dumps(record, sort_keys=True) + '\n')
+            return
+        events = [{
+            'name': f"bg-{record['index']:03d}" if record['stage'] == 'total' else record['stage'],
+            'cat': record['generator'],
+            'ph': 'X',
+            'ts': round(record['start'] * 1e6),
+            'dur': round(record['wall'] * 1e6),
+            'pid': 0,
+            'tid': record['pid'],
+            'args': {'index': record['index'], 'cpu_ms': round(record['cpu'] * 1000, 3)},
+        } for record in records]
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+def summarize_profile(records):
+    """Total wall and CPU seconds per generator and stage, plus a count of backgrounds"""
+    summary = {}
+    for record in records:
+        totals = summary.setdefault(record['generator'], {'backgrounds': 0})
+        if record['stage'] == 'total':
+            totals['backgrounds'] += 1
+        wall, cpu = totals.get(record['stage'], (0.0, 0.0))
+        totals[record['stage']] = (wall + record['wall'], cpu + record['cpu'])
+    return summary
+
+def print_profile_summary(records):
+    """Print each generator's time per stage as wall/CPU seconds"""
+    columns = PROFILE_STAGES + ['total']
+    print(f"\n{'generator':<28}{'n':>4}" + "".join(f"{name:>16}" for name in columns))
+    for generator, totals in sorted(summarize_profile(records).items()):
+        cells = "".join(f"{'{:.2f}/{:.2f}'.format(*totals.get(name, (0.0, 0.0))):>16}" for name in columns)
+        print(f"{generator:<28}{totals['backgrounds']:>4}{cells}")
+
+def parse_args(argv=None, prog=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(prog=prog, description="Generate 160 background images for event cards")
+    parser.add_argument('--out', default=BACKGROUNDS_DIR,
+                        help=f"output directory (default: {BACKGROUNDS_DIR})")
+    parser.add_argument('--scale', type=int, choices=PRINT_SCALES, default=1,
+                        help="canvas multiplier for print output (default: 1, i.e. 800x600)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument('--seed', type=int,
+                        help="master seed; reruns with the same seed write byte-identical files")
+    parser.add_argument('--index', type=int, action='append', dest='indices', metavar='N',
+                        help=f"only (re)generate background N (1-{TOTAL_BACKGROUNDS}); repeatable")
+    parser.add_argument('--min-psnr', type=float, default=DEFAULT_MIN_PSNR,
+                        help=f"lowest PSNR in dB a lossy encoding may reach (default: {DEFAULT_MIN_PSNR:g})")
+    parser.add_argument('--tiled', action='store_true',
+                        help="render in bounded-memory tiles and stream the print size to PNG")
+    parser.add_argument('--bake-effects', metavar='NAME',
+                        help="bake the default blur, brightness, contrast and vignette of background NAME "
+                             "in elements-config.js into every image")
+    parser.add_argument('--force', action='store_true',
+                        help="regenerate every background even if the manifest says it is current")
+    parser.add_argument('--profile', metavar='FILE', default=os.environ.get('BACKGROUNDS_PROFILE'),
+                        help="record per-stage wall and CPU times to FILE: a Chrome trace if it ends "
+                             "in .json, JSON lines otherwise (default: $BACKGROUNDS_PROFILE)")
+    parser.add_argument('--cprofile', metavar='DIR', default=os.environ.get('BACKGROUNDS_CPROFILE'),
+                        help="save a cProfile dump per background to DIR (default: $BACKGROUNDS_CPROFILE)")
+    return parser.parse_args(argv)
+
+def main(argv=None, prog=None):
+    """Main function to generate 160 backgrounds"""
+    args = parse_args(argv, prog)
+    workers = args.workers or os.cpu_count() or 1
+    backgrounds_dir = args.out
+    os.makedirs(backgrounds_dir, exist_ok=True)
+    manifest_path = os.path.join(backgrounds_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    
+    # Reuse the last run's seed by default so an unchanged tree is a no-op
+    master_seed = args.seed if args.seed is not None else manifest['seed']
+    if master_seed is None:
+        master_seed = random.SystemRandom().randrange(2**32)
+    manifest['seed'] = master_seed
+    indices = sorted(set(args.indices)) if args.indices else range(1, TOTAL_BACKGROUNDS + 1)
+    effects = config_effects(args.bake_effects) if args.bake_effects else None
+    
+    print("Starting background generation...")
+    print(f"Output directory: {os.path.abspath(backgrounds_dir)}")
+    print(f"Master seed: {master_seed} ({workers} worker{'s' if workers > 1 else ''})")
+    
+    start_time = time.time()
+    assets = manifest['assets']
+    plans = {}
+    tasks = []
+    for i in indices:
+        params, input_hash = plan_background(master_seed, i, args.scale, args.min_psnr, args.tiled,
+                                             effects)
+        if not args.force and is_up_to_date(assets.get(str(i)), input_hash, backgrounds_dir):
+            continue
+        plans[i] = (params, input_hash)
+        tasks.append((i, params['seed'], args.scale, args.min_psnr, args.tiled, effects, backgrounds_dir,
+                      bool(args.profile), args.cprofile))
+    print(f"{len(tasks)} of {len(indices)} backgrounds need rebuilding")
+    generated = 0
+    if args.cprofile:
+        os.makedirs(args.cprofile, exist_ok=True)
+    profile_records = []
+    
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(tasks) > 1 else None
+    try:
+        results = []
+        if tasks:
+            # Only drawing needs PIL, so a run with nothing to rebuild never loads it
+            from .background_render import _generate_task
+            # Both map()s yield results in index order as soon as each is ready
+            results = executor.map(_generate_task, tasks) if executor else map(_generate_task, tasks)
+        for i, result, error, stage_times in results:
+            for record in stage_times or []:
+                record.update(index=i, generator=plans[i][0]['generator'])
+                profile_records.append(record)
+            # The old entry stays until the new files are written, so a failed
+            # rebuild keeps tracking what is still on disk and is retried next run
+            previous = assets.get(str(i))
+            if error is None:
+                generated += 1
+                variants, encoding = result
+                full = next(variant for variant in variants if variant['rung'] == 'full')
+                print(f"Generated: {full['file']} ({len(variants)} sizes) as "
+                      f"{encoding['label']}, {encoding['bytes'] / 1024:.1f} KB at "
+                      f"{encoding['psnr']:.1f} dB ({len(encoding['candidates'])} candidates tried)")
+                # A new format or ladder leaves the old files behind
+                current = {variant['file'] for variant in variants}
+                for variant in (previous or {}).get('variants', []):
+                    if variant['file'] not in current:
+                        try:
+                            os.remove(os.path.join(backgrounds_dir, variant['file']))
+                        except OSError:
+                            pass
+                for variant in variants:
+                    path = os.path.join(backgrounds_dir, variant['file'])
+                    variant['size'] = os.path.getsize(path)
+                    variant['output_hash'] = file_digest(path)
+                params, input_hash = plans[i]
+                assets[str(i)] = {
+                    'params': params,
+                    'input_hash': input_hash,
+                    'variants': variants,
+                    'encoding': {key: encoding[key] for key in ('label', 'bytes', 'candidates')},
+                }
+            else:
+                print(f"Error generating background {i}: {error}")
+            if i % 20 == 0:
+                print(f"Progress: {i}/{TOTAL_BACKGROUNDS} backgrounds generated")
+    finally:
+        if executor:
+            executor.shutdown()
+        save_manifest(manifest_path, manifest)
+        write_ladder_manifest(os.path.join(backgrounds_dir, LADDER_MANIFEST_NAME), assets)
+        if args.profile:
+            write_profile(args.profile, profile_records)
+    
+    end_time = time.time()
+    duration = end_time - start_time
+    
+    print(f"\nBackground generation complete!")
+    print(f"Generated {generated} backgrounds in {duration:.2f} seconds")
+    print(f"Files saved to: {os.path.abspath(backgrounds_dir)}")
+    if args.profile:
+        print_profile_summary(profile_records)
+        print(f"Stage timings written to {args.profile}")
+
+if __name__ == "__main__":
+    main()
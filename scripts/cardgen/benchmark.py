@@ -0,0 +1,271 @@
+"""
+Benchmark every background and decoration generator
+
+Times each function in background_render.generators at several canvas
+sizes and each one in decorations.PATTERN_GENERATORS at several
+batch sizes, all from fixed seeds so every run draws exactly the same
+images. Each case runs in a fresh process so its peak memory is its own,
+and the results are written to JSON for comparing one commit with another.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import hashlib
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+import multiprocessing
+
+try:
+    import resource
+except ImportError:  # Windows; peak RSS is reported as null there
+    resource = None
+
+# Background canvases: the 800x600 preview and the 2x and 4x print scales
+BACKGROUND_SIZES = [(800, 600), (1600, 1200), (3200, 2400)]
+
+# Decorations drawn per case; a single decoration is too quick to time alone
+DECORATION_COUNTS = [10, 200]
+
+DEFAULT_SEED = 2024
+DEFAULT_REPEAT = 3
+
+# A case this much slower than in the baseline counts as a regression
+DEFAULT_THRESHOLD = 1.25
+
+RESULTS_VERSION = 1
+
+def case_seed(seed, kind, name, index=0):
+    """Seed for one run of a case, stable across processes and Python versions"""
+    key = f"{kind}:{name}:{seed}:{index}".encode()
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], 'big')
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def run_background(name, size, seed, tiled):
+    """Draw one background and encode it as PNG; returns the encoded size"""
+    from . import background_render as gb
+    generator = next(g for g in gb.generators if g.__name__ == name)
+    width, height = size
+    random.seed(case_seed(seed, 'backgrounds', name))
+    colors = random.choice(gb.color_palettes)
+    # Same argument choices as generate_background()
+    if generator == gb.create_gradient_background:
+        img = generator(width, height, random.sample(colors, random.randint(2, 3)),
+                        angle=random.choice(gb.GRADIENT_ANGLES), tiled=tiled)
+    elif generator == gb.create_radial_gradient:
+        img = generator(width, height, random.sample(colors, random.randint(2, 3)), tiled=tiled)
+    else:
+        img = generator(width, height, colors, tiled=tiled)
+    if tiled:
+        # Stream the bands to a real PNG, as the print rung is written
+        path = os.path.join(tempfile.mkdtemp(), f"{name}.png")
+        writer = gb.PNGWriter(path, width, height)
+        for band in gb.render_tiled(img, width, height):
+            writer.write_band(band)
+        writer.close()
+        size = os.path.getsize(path)
+        shutil.rmtree(os.path.dirname(path))
+        return {'bytes': size}
+    return {'bytes': len(gb.encode_image(img, 'PNG', {}))}
+
+def run_decorations(name, count, seed):
+    """Draw count minified decorations; returns their total size and element count"""
+    from . import decorations as gd
+    generator = next(g for g in gd.PATTERN_GENERATORS if g.__name__ == name)
+    total_bytes = elements = 0
+    for index in range(count):
+        random.seed(case_seed(seed, 'decorations', name, index))
+        colors = gd.COLORS[random.choice(sorted(gd.COLORS))]
+        scene = generator(colors)
+        total_bytes += len(gd.to_svg(scene, minify=True).encode())
+        elements += len(scene)
+    return {'bytes': total_bytes, 'shapes': elements}
+
+def _run_case(case, repeat, seed):
+    """Run one case repeat times in this process and summarize it"""
+    kind, name, param, tiled = case
+    if kind == 'backgrounds':
+        from . import background_render  # keep import time and memory out of the measurements
+        run = lambda: run_background(name, param, seed, tiled)
+    else:
+        from . import decorations
+        run = lambda: run_decorations(name, param, seed)
+    rss_before = peak_rss()
+    times = []
+    cpu_times = []
+    for _ in range(repeat):
+        start, cpu_start = time.perf_counter(), time.process_time()
+        output = run()
+        times.append(time.perf_counter() - start)
+        cpu_times.append(time.process_time() - cpu_start)
+    rss_after = peak_rss()
+    # tracemalloc slows allocation down, so it gets a run of its own. It sees
+    # Python and NumPy memory but not Pillow's image buffers; RSS covers those.
+    tracemalloc.start()
+    run()
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    result = {
+        'kind': kind,
+        'generator': name,
+        'tiled': tiled,
+        'seconds': {'min': min(times), 'median': statistics.median(times), 'runs': times},
+        'cpu_seconds': min(cpu_times),
+        'peak_rss_bytes': rss_after,
+        'peak_rss_growth_bytes': rss_after - rss_before if rss_after is not None else None,
+        'peak_traced_bytes': traced_peak,
+        **output,
+    }
+    if kind == 'backgrounds':
+        result['width'], result['height'] = param
+    else:
+        result['count'] = param
+    return result
+
+def case_key(result):
+    """Identity of a case for matching results between two runs"""
+    param = (f"{result['width']}x{result['height']}" if result['kind'] == 'backgrounds'
+             else f"x{result['count']}")
+    return f"{result['kind']}/{result['generator']}/{param}{'/tiled' if result['tiled'] else ''}"
+
+def plan_cases(kinds, sizes, counts, tiled, only=None):
+    """Every (kind, generator, size or count, tiled) case to run"""
+    cases = []
+    if 'backgrounds' in kinds:
+        from .backgrounds import GENERATOR_NAMES
+        for name in GENERATOR_NAMES:
+            for size in sizes:
+                cases.append(('backgrounds', name, size, tiled))
+    if 'decorations' in kinds:
+        from . import decorations as gd
+        for generator in gd.PATTERN_GENERATORS:
+            for count in counts:
+                cases.append(('decorations', generator.__name__, count, False))
+    if only:
+        cases = [case for case in cases if any(text in case[1] for text in only)]
+    return cases
+
+def git_commit():
+    """The current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment():
+    """Versions and machine details that affect the timings"""
+    from PIL import __version__ as pillow_version
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {'python': platform.python_version(), 'pillow': pillow_version, 'numpy': numpy_version,
+            'platform': platform.platform(), 'cpus': os.cpu_count()}
+
+def run_benchmarks(cases, repeat=DEFAULT_REPEAT, seed=DEFAULT_SEED, report=print):
+    """Run every case, one fresh process each, and return the results document"""
+    results = []
+    # spawn gives each case a clean process on every platform
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for case in cases:
+            result = pool.apply(_run_case, (case, repeat, seed))
+            results.append(result)
+            rss = result['peak_rss_bytes']
+            report(f"{case_key(result):<60} {result['seconds']['median'] * 1000:9.1f} ms "
+                   f"{(rss or 0) / 2**20:7.1f} MB {result['bytes'] or 0:>10} bytes")
+    return {'version': RESULTS_VERSION, 'commit': git_commit(), 'seed': seed, 'repeat': repeat,
+            'environment': environment(), 'results': results}
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD, report=print):
+    """Report cases whose median time or peak memory grew past threshold; returns them"""
+    previous = {case_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        key = case_key(result)
+        old = previous.get(key)
+        if old is None:
+            continue
+        ratios = {'time': result['seconds']['median'] / max(old['seconds']['median'], 1e-9)}
+        if result['peak_rss_growth_bytes'] is not None and old.get('peak_rss_growth_bytes'):
+            # Small cases barely move RSS; only compare where there is something to measure
+            if old['peak_rss_growth_bytes'] > 2**20:
+                ratios['memory'] = result['peak_rss_growth_bytes'] / old['peak_rss_growth_bytes']
+        slower = {metric: ratio for metric, ratio in ratios.items() if ratio > threshold}
+        if slower:
+            regressions.append(key)
+            report(f"REGRESSION {key}: " + ", ".join(f"{metric} x{ratio:.2f}" for metric, ratio in slower.items()))
+    return regressions
+
+def parse_size(text):
+    """Parse WIDTHxHEIGHT"""
+    try:
+        width, height = (int(v) for v in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got '{text}'")
+    return width, height
+
+def parse_args(argv=None, prog=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(prog=prog, description="Benchmark the background and decoration generators")
+    parser.add_argument('--kind', choices=['backgrounds', 'decorations'], action='append',
+                        help="only benchmark this kind; repeatable (default: both)")
+    parser.add_argument('--only', action='append', metavar='TEXT',
+                        help="only generators whose function name contains TEXT; repeatable")
+    parser.add_argument('--size', type=parse_size, action='append', metavar='WxH',
+                        help="background canvas size; repeatable (default: 800x600, 1600x1200, 3200x2400)")
+    parser.add_argument('--count', type=int, action='append',
+                        help="decorations per case; repeatable (default: 10, 200)")
+    parser.add_argument('--tiled', action='store_true',
+                        help="render backgrounds with the tiled, streaming pipeline")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f"timed runs per case (default: {DEFAULT_REPEAT})")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help=f"seed every case is drawn from (default: {DEFAULT_SEED})")
+    parser.add_argument('--out', default="benchmark-results.json",
+                        help="where to write the results (default: benchmark-results.json)")
+    parser.add_argument('--compare', metavar='FILE',
+                        help="earlier results to compare against; exits non-zero on regressions")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"slowdown ratio counted as a regression (default: {DEFAULT_THRESHOLD})")
+    return parser.parse_args(argv)
+
+def main(argv=None, prog=None):
+    """Run the benchmarks, write the results and compare them if asked"""
+    args = parse_args(argv, prog)
+    cases = plan_cases(args.kind or ['backgrounds', 'decorations'], args.size or BACKGROUND_SIZES,
+                       args.count or DECORATION_COUNTS, args.tiled, args.only)
+    print(f"Running {len(cases)} benchmark cases, {args.repeat} runs each")
+    results = run_benchmarks(cases, args.repeat, args.seed)
+    with open(args.out, 'w', newline='\n') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+    print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions against {args.compare}")
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+if __name__ == "__main__":
+    main()
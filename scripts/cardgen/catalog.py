@@ -0,0 +1,253 @@
+"""
+Build a precomputed index of the elements catalog
+
+Reads elements/elements-config.js, checks every configured file exists,
+and walks elements/backgrounds, elements/decorations and elements/overlays
+for files the config doesn't list. The result is an inverted index
+(tag -> keys and category -> keys per element kind) plus metadata shards
+(one per kind and category) holding each element's config, byte size,
+dimensions and hash. A front end can then look elements up directly
+and fetch only the shard it needs instead of scanning the whole config.
+
+Standard library only; raster dimensions beyond PNG use Pillow when it
+is installed.
+"""
+
+import os
+import re
+import sys
+import json
+import struct
+import argparse
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from .common import ELEMENTS_CONFIG_PATH, ELEMENTS_DIR, file_digest, load_elements_config
+
+# Element kinds, each a top-level key of ELEMENTS_CONFIG and a directory under elements/
+KINDS = ('backgrounds', 'decorations', 'overlays')
+
+ASSET_EXTENSIONS = {'.svg', '.png', '.webp', '.jpg', '.jpeg'}
+
+# Build outputs kept next to the assets that are not elements themselves
+DERIVED_PREFIXES = ('atlas.', '.')
+
+# Shard of files found on disk but missing from the config
+UNLISTED = 'unlisted'
+
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+
+LENGTH_RE = re.compile(r'^\s*([\d.]+)\s*(px)?\s*$')
+
+def svg_size(path):
+    """(width, height) from an SVG's root width/height, else its viewBox; None if neither"""
+    for _, root in ET.iterparse(path, events=('start',)):
+        box = root.get('viewBox', '').replace(',', ' ').split()
+        sizes = [LENGTH_RE.match(root.get(name) or '') for name in ('width', 'height')]
+        if all(sizes):
+            return tuple(float(match.group(1)) for match in sizes)
+        if len(box) == 4:
+            return float(box[2]), float(box[3])
+        return None
+
+def raster_size(path):
+    """(width, height) of a raster image; None when it can't be read"""
+    with open(path, 'rb') as f:
+        header = f.read(24)
+    if header[:8] == b'\x89PNG\r\n\x1a\n':
+        return struct.unpack('>II', header[16:24])
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    with Image.open(path) as img:
+        return img.size
+
+def file_info(path):
+    """Byte size, dimensions and SHA-256 of an asset file"""
+    try:
+        size = svg_size(path) if path.suffix == '.svg' else raster_size(path)
+    except (ET.ParseError, OSError, ValueError):
+        size = None
+    info = {'bytes': path.stat().st_size, 'hash': file_digest(path)}
+    if size:
+        info['width'], info['height'] = (whole(v) for v in size)
+    return info
+
+def whole(value):
+    """A dimension as an int when it is one, so 100.0 is written as 100"""
+    return int(value) if float(value).is_integer() else value
+
+def load_sprites(directory):
+    """Sprite map of a directory's atlas.json, or {} without one"""
+    try:
+        with open(directory / "atlas.json") as f:
+            return json.load(f).get('sprites', {})
+    except (OSError, ValueError):
+        return {}
+
+def asset_files(directory):
+    """Element files directly inside a directory, by name"""
+    if not directory.is_dir():
+        return {}
+    return {path.name: path for path in sorted(directory.iterdir())
+            if path.is_file() and path.suffix.lower() in ASSET_EXTENSIONS
+            and not path.name.startswith(DERIVED_PREFIXES)}
+
+def index_kind(kind, entries, directory, problems):
+    """Metadata for every element of one kind, keyed by element key
+
+    Configured entries whose file is missing are reported in problems and
+    left out. Files nobody configured are added under their file stem with
+    listed set to false, so drift between the config and the directory
+    shows up in the index too.
+    """
+    files = asset_files(directory)
+    sprites = None
+    elements = {}
+    used = set()
+    for key, entry in entries.items():
+        where = f"{kind}.{key}"
+        file = entry.get('file')
+        if not file:
+            problems.append(('error', f"{where} has no file"))
+            continue
+        name, _, fragment = file.partition('#')
+        path = directory / name
+        if fragment:
+            # "atlas.svg#balloons": the sprite's source file carries the size and hash
+            sprites = load_sprites(directory) if sprites is None else sprites
+            sprite = sprites.get(fragment)
+            if not path.is_file() or sprite is None:
+                problems.append(('error', f"{where}: sprite {file} not found"))
+                continue
+            path = directory / sprite['source']
+        if not path.is_file():
+            problems.append(('error', f"{where}: {directory / name} does not exist"))
+            continue
+        used.add(path.name)
+        if not isinstance(entry.get('category'), str):
+            problems.append(('warning', f"{where} has no category"))
+        if not isinstance(entry.get('tags', []), list):
+            problems.append(('warning', f"{where}: tags is not a list"))
+        element = dict(entry, **file_info(path), listed=True)
+        if fragment:
+            element['width'], element['height'] = whole(sprite['width']), whole(sprite['height'])
+        elements[key] = element
+
+    unlisted = [name for name in files if name not in used]
+    for name in unlisted:
+        key = Path(name).stem
+        if key in elements:
+            key = name
+        elements[key] = dict(file=name, **file_info(files[name]), listed=False)
+    if unlisted:
+        problems.append(('warning', f"{len(unlisted)} files in {directory} are not in the config"))
+    return elements
+
+def inverted(elements, field):
+    """value -> sorted keys of the elements whose field has (or contains) that value"""
+    index = {}
+    for key, element in elements.items():
+        values = element.get(field)
+        for value in values if isinstance(values, list) else [values]:
+            if isinstance(value, str):
+                index.setdefault(value, []).append(key)
+    return {value: sorted(keys) for value, keys in sorted(index.items())}
+
+def shard_name(kind, element):
+    """File of the metadata shard an element lives in"""
+    category = element.get('category') if element['listed'] else UNLISTED
+    slug = re.sub(r'[^a-z0-9]+', '-', str(category or 'uncategorized').lower()).strip('-')
+    return f"{kind}-{slug}.json"
+
+def build_index(config_path=ELEMENTS_CONFIG_PATH, elements_dir=ELEMENTS_DIR):
+    """Build the index document and its shards; returns (index, shards, problems)
+
+    problems is a list of (level, message), level being 'error' for
+    configured files that don't exist and 'warning' otherwise.
+    """
+    config = load_elements_config(config_path)
+    problems = []
+    index = {'version': INDEX_VERSION, 'config_hash': file_digest(config_path)}
+    shards = {}
+    for kind in KINDS:
+        elements = index_kind(kind, config.get(kind) or {}, Path(elements_dir) / kind, problems)
+        located = {}
+        for key, element in elements.items():
+            name = shard_name(kind, element)
+            shards.setdefault(name, {})[key] = element
+            located[key] = name
+        index[kind] = {
+            'count': len(elements),
+            'tags': inverted(elements, 'tags'),
+            'categories': inverted(elements, 'category'),
+            'shards': dict(sorted(located.items())),
+        }
+    return index, shards, problems
+
+def write_json(path, data):
+    """Write compact, key-sorted JSON, leaving the file alone when it is unchanged
+
+    Untouched files keep their modification times, so HTTP caches and
+    incremental deploys only see shards that really changed. Returns
+    whether the file was written.
+    """
+    text = json.dumps(data, sort_keys=True, separators=(',', ':')) + '\n'
+    try:
+        if path.read_text(encoding='utf-8') == text:
+            return False
+    except OSError:
+        pass
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(text, encoding='utf-8', newline='\n')
+    os.replace(tmp_path, path)
+    return True
+
+def write_index(output_dir=None, config_path=ELEMENTS_CONFIG_PATH, elements_dir=ELEMENTS_DIR):
+    """Write index.json and every shard into output_dir (default: elements/catalog)
+
+    Shards no longer produced are deleted; other files, such as an
+    atlas.json in the same directory, are left alone. Returns the
+    problems found.
+    """
+    output_dir = Path(output_dir or Path(elements_dir) / "catalog")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index, shards, problems = build_index(config_path, elements_dir)
+    written = [name for name, shard in sorted(shards.items()) if write_json(output_dir / name, shard)]
+    if write_json(output_dir / INDEX_NAME, index):
+        written.append(INDEX_NAME)
+    # Only files named like shards are ours to delete; the directory may hold other JSON
+    for kind in KINDS:
+        for path in output_dir.glob(f'{kind}-*.json'):
+            if path.name not in shards:
+                path.unlink()
+
+    for level, message in problems:
+        print(f"{level}: {message}")
+    counts = ", ".join(f"{index[kind]['count']} {kind}" for kind in KINDS)
+    print(f"Indexed {counts} into {output_dir} ({len(shards)} shards, {len(written)} files updated)")
+    return problems
+
+def parse_args(argv=None, prog=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(prog=prog, description="Build the elements catalog's tag and category index")
+    parser.add_argument('--config', default=ELEMENTS_CONFIG_PATH,
+                        help=f"elements config to read (default: {ELEMENTS_CONFIG_PATH})")
+    parser.add_argument('--elements', default=ELEMENTS_DIR,
+                        help=f"directory holding backgrounds/, decorations/ and overlays/ (default: {ELEMENTS_DIR})")
+    parser.add_argument('--out', help="output directory (default: ELEMENTS/catalog)")
+    parser.add_argument('--strict', action='store_true',
+                        help="exit non-zero when a configured file is missing")
+    return parser.parse_args(argv)
+
+def main(argv=None, prog=None):
+    """Write the index and report what doesn't match the config"""
+    args = parse_args(argv, prog)
+    problems = write_index(args.out, args.config, args.elements)
+    if args.strict and any(level == 'error' for level, _ in problems):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Single command line for every generator
+
+    python -m scripts.cardgen COMMAND [options]
+
+Each command's module is imported only once it is chosen, so --help,
+list and check never load PIL or NumPy.
+"""
+
+import sys
+import argparse
+import importlib
+
+# Command -> (module with main(argv, prog), or None for one defined here; one-line help)
+COMMANDS = {
+    'backgrounds': ('backgrounds', "generate the 160 background images"),
+    'decorations': ('decorations', "generate the 200 SVG decorations"),
+    'atlas': ('atlas', "pack the decorations into one sprite atlas"),
+    'thumbnails': ('rasterize', "rasterize the decorations to PNG thumbnails"),
+    'index': ('catalog', "index the elements catalog by tag and category"),
+    'compose': ('compositor', "flatten invitation layers into single images"),
+    'guests': ('guests', "render one personalized invitation per guest"),
+    'benchmark': ('benchmark', "time every background and decoration generator"),
+    'list': (None, "list the background and decoration generators"),
+    'check': ('deps', "check (or --install) the Python requirements"),
+}
+
+def list_generators(argv=None, prog=None):
+    """Print every generator by the name manifests and benchmarks use"""
+    parser = argparse.ArgumentParser(prog=prog, description="List the background and decoration generators")
+    parser.parse_args(argv)
+    from .backgrounds import GENERATOR_NAMES
+    from .decorations import PATTERN_GENERATORS
+    print(f"Backgrounds ({len(GENERATOR_NAMES)}):")
+    for name in GENERATOR_NAMES:
+        print(f"  {name}")
+    print(f"\nDecorations ({len(PATTERN_GENERATORS)}):")
+    for generator in PATTERN_GENERATORS:
+        print(f"  {generator.__name__}")
+
+def main(argv=None):
+    """Dispatch to a command's main()"""
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        prog="cardgen",
+        description="Event card asset generators",
+        epilog="commands:\n" + "\n".join(f"  {name:<13}{text}" for name, (_, text) in COMMANDS.items())
+               + "\n\nRun 'cardgen COMMAND --help' for a command's options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=COMMANDS, metavar='COMMAND')
+    args = parser.parse_args(argv[:1])
+    prog = f"cardgen {args.command}"
+    if args.command == 'list':
+        return list_generators(argv[1:], prog)
+    try:
+        module = importlib.import_module(f".{COMMANDS[args.command][0]}", __package__)
+    except ImportError as e:
+        sys.exit(f"{e}\nRun 'python -m scripts.cardgen check --install' to install the requirements.")
+    return module.main(argv[1:], prog)
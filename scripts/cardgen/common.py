@@ -0,0 +1,72 @@
+"""
+Helpers shared by the generators: per-asset seeds, build manifests and
+reading elements/elements-config.js
+
+Standard library only, so importing it never pulls in PIL.
+"""
+
+import os
+import re
+import json
+import hashlib
+
+ELEMENTS_DIR = "elements"
+ELEMENTS_CONFIG_PATH = os.path.join(ELEMENTS_DIR, "elements-config.js")
+
+def asset_seed(generator_name, master_seed, index):
+    """Hash the master seed and an asset index into that asset's seed
+
+    The generator name is mixed in so backgrounds and decorations never
+    share a random stream.
+    """
+    key = f"{generator_name}:{master_seed}:{index}".encode()
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], 'big')
+
+def load_manifest(path):
+    """Read a build manifest, or an empty one if missing or unreadable"""
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'seed': None, 'assets': {}}
+    manifest.setdefault('seed', None)
+    manifest.setdefault('assets', {})
+    return manifest
+
+def save_manifest(path, manifest):
+    """Write a manifest via a temp file so an interrupted run can't leave it half-written"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', newline='\n') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+def file_digest(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_js_constant(text, name):
+    """Parse `const NAME = {...};` (or [...]) out of a JS source file
+
+    The config is a plain object literal: dropping comments and trailing
+    commas and quoting the keys is enough to turn it into JSON.
+    """
+    start = text.index(f"const {name} =")
+    start = min(i for i in (text.find('{', start), text.find('[', start)) if i >= 0)
+    closing = '\n}' if text[start] == '{' else '\n]'
+    literal = text[start:text.index(closing + ';', start) + 2]
+    literal = re.sub(r'^\s*//.*$', '', literal, flags=re.M)
+    literal = re.sub(r'([{,]\s*)([A-Za-z_$][\w$]*)\s*:', r'\1"\2":', literal)
+    literal = re.sub(r',(\s*[}\]])', r'\1', literal)
+    return json.loads(literal)
+
+def load_elements_config(path=ELEMENTS_CONFIG_PATH, names=('ELEMENTS_CONFIG',)):
+    """Read constants from elements-config.js; one value for one name, else a tuple"""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    values = tuple(read_js_constant(text, name) for name in names)
+    return values[0] if len(values) == 1 else values
@@ -0,0 +1,431 @@
+"""
+Composite invitations into a single image or flattened SVG
+
+Reads elements/elements-config.js and flattens a background, an optional
+overlay frame and the chosen decorations into one file, placing each
+decoration the way the builder's slideshow does (translate to its
+position, scale, rotate, fade), so clients draw one image instead of a
+stack of layered SVGs.
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import math
+import time
+import argparse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from PIL import Image
+
+from .atlas import SVG_NS, view_box, prefix_ids
+from .common import ELEMENTS_CONFIG_PATH, ELEMENTS_DIR, load_elements_config
+from .rasterize import UnsupportedSVG, rasterize
+from .render_cache import DISK_LIMIT, LayerCache
+
+# The builder's card in SVG user units (see the #sprites viewBox)
+CARD_SIZE = (900, 1350)
+
+# Overlay frames live in elements/overlays as frame-<name>.svg
+OVERLAY_PREFIX = "frame-"
+
+# Lossy quality for WebP and JPEG output
+RASTER_QUALITY = 90
+
+# Flattened templates kept per process; guests sharing a template reuse them
+COMPOSITE_MEMORY_LIMIT = 64 * 1024 * 1024
+
+# Rasterized layers shared between workers and runs, under the output directory
+CACHE_DIR_NAME = ".layer-cache"
+
+FORMATS = {'svg': 'svg', 'png': 'PNG', 'webp': 'WEBP', 'jpeg': 'JPEG'}
+
+def load_config(path=ELEMENTS_CONFIG_PATH):
+    """Read ELEMENTS_CONFIG and SLIDESHOW_COMBINATIONS from elements-config.js"""
+    return load_elements_config(path, ('ELEMENTS_CONFIG', 'SLIDESHOW_COMBINATIONS'))
+
+def plan_layers(config, template, elements_dir=ELEMENTS_DIR):
+    """List the layers of one invitation, bottom to top
+
+    template names a background, an optional overlay frame and a list of
+    decorations by their config keys, like an entry of
+    SLIDESHOW_COMBINATIONS. As in the slideshow, the n-th decoration goes
+    to position n (wrapping around) of its config entry.
+    """
+    elements_dir = Path(elements_dir)
+    layers = []
+
+    background = template.get('background')
+    if background:
+        if background not in config['backgrounds']:
+            raise ValueError(f"Unknown background '{background}'")
+        entry = config['backgrounds'][background]
+        layers.append({'file': elements_dir / 'backgrounds' / entry['file'], 'cover': True,
+                       'opacity': entry.get('defaultOpacity', 100) / 100})
+
+    for index, key in enumerate(template.get('decorations', [])):
+        if key not in config['decorations']:
+            raise ValueError(f"Unknown decoration '{key}'")
+        entry = config['decorations'][key]
+        positions = entry.get('positions') or [{'x': 0, 'y': 0}]
+        position = positions[index % len(positions)]
+        layers.append({'file': elements_dir / 'decorations' / entry['file'], 'cover': False,
+                       'opacity': entry.get('defaultOpacity', 100) / 100,
+                       'x': position['x'], 'y': position['y'],
+                       'scale': entry.get('defaultScale', 1.0),
+                       'rotation': entry.get('defaultRotation', 0)})
+
+    overlay = template.get('overlay')
+    if overlay:
+        name = overlay if overlay.startswith(OVERLAY_PREFIX) else OVERLAY_PREFIX + overlay
+        path = elements_dir / 'overlays' / f"{name}.svg"
+        if not path.exists():
+            raise ValueError(f"Unknown overlay '{overlay}'")
+        layers.append({'file': path, 'cover': True, 'opacity': 1.0})
+
+    return layers
+
+def compose_svg(layers, size=CARD_SIZE):
+    """Flatten layers into one SVG document
+
+    Each layer's content is inlined as a nested <svg> (ids prefixed per
+    layer so gradients and filters can't collide); decorations get the
+    slideshow's translate/scale/rotate transform and opacity on a <g>.
+    """
+    card = ET.Element(f'{{{SVG_NS}}}svg', {
+        'width': str(size[0]), 'height': str(size[1]), 'viewBox': f"0 0 {size[0]} {size[1]}",
+    })
+    ET.SubElement(card, f'{{{SVG_NS}}}rect', {'width': '100%', 'height': '100%', 'fill': '#fff'})
+
+    for index, layer in enumerate(layers):
+        root = ET.parse(layer['file']).getroot()
+        prefix_ids(root, f"layer{index}--")
+        box = view_box(root)
+        nested = ET.Element(f'{{{SVG_NS}}}svg', {
+            key: value for key, value in root.attrib.items()
+            if key not in ('width', 'height', 'viewBox', 'x', 'y', 'version')
+        })
+        nested.set('viewBox', " ".join(f"{v:g}" for v in box))
+        nested.extend(list(root))
+
+        group = ET.SubElement(card, f'{{{SVG_NS}}}g')
+        if layer['opacity'] < 1:
+            group.set('opacity', f"{layer['opacity']:g}")
+        if layer['cover']:
+            nested.set('width', str(size[0]))
+            nested.set('height', str(size[1]))
+            nested.set('preserveAspectRatio', 'xMidYMid slice')
+        else:
+            nested.set('width', f"{box[2]:g}")
+            nested.set('height', f"{box[3]:g}")
+            group.set('transform', f"translate({layer['x']:g} {layer['y']:g}) "
+                                   f"scale({layer['scale']:g}) rotate({layer['rotation']:g})")
+        group.append(nested)
+
+    return ET.tostring(card, encoding='utf-8')
+
+def cairosvg_available():
+    """Whether cairosvg and the native cairo library it wraps can be loaded"""
+    try:
+        import cairosvg  # noqa: F401
+    except (ImportError, OSError):
+        return False
+    return True
+
+def default_format():
+    """png when cairosvg can draw it, else svg
+
+    The built-in rasterizer can't draw the gradients and arcs the shipped
+    backgrounds and overlays use, so without cairosvg most raster
+    compositions would fail.
+    """
+    return 'png' if cairosvg_available() else 'svg'
+
+def rasterize_svg(path, width, height):
+    """Render an SVG file to an RGBA image of exactly width x height
+
+    Uses cairosvg when it is installed, and otherwise the built-in
+    rasterizer, which covers the generated decorations but not gradients
+    or arcs.
+    """
+    try:
+        import cairosvg
+    except (ImportError, OSError) as e:
+        try:
+            return rasterize(path, width, height)
+        except UnsupportedSVG as unsupported:
+            raise RuntimeError(f"{path} needs cairosvg ({unsupported}; "
+                               f"cairosvg: {e.__class__.__name__})") from None
+    png = cairosvg.svg2png(url=str(path), output_width=width, output_height=height)
+    return Image.open(io.BytesIO(png)).convert('RGBA')
+
+def render_layer(layer, factor, size=CARD_SIZE):
+    """Rasterize one layer at `factor` pixels per card unit
+
+    Returns the RGBA image and where its top-left corner sits relative to
+    the layer's position, so the same decoration can be reused anywhere.
+    """
+    root = ET.parse(layer['file']).getroot()
+    _, _, width, height = view_box(root)
+    if layer['cover']:
+        # Scale to cover the card, then crop the overflow evenly (xMidYMid slice)
+        cover = max(size[0] / width, size[1] / height) * factor
+        img = rasterize_svg(layer['file'], round(width * cover), round(height * cover))
+        target = (round(size[0] * factor), round(size[1] * factor))
+        left, top = (img.width - target[0]) // 2, (img.height - target[1]) // 2
+        img = img.crop((left, top, left + target[0], top + target[1]))
+        offset = (0, 0)
+    else:
+        scale = layer['scale'] * factor
+        img = rasterize_svg(layer['file'], max(round(width * scale), 1), max(round(height * scale), 1))
+        offset = (0, 0)
+        if layer['rotation']:
+            # SVG rotates about the layer's origin; PIL about the image center,
+            # so find where the center goes and line the expanded image up on it
+            angle = math.radians(layer['rotation'])
+            cx, cy = img.width / 2, img.height / 2
+            img = img.rotate(-layer['rotation'], resample=Image.BICUBIC, expand=True)
+            offset = (cx * math.cos(angle) - cy * math.sin(angle) - img.width / 2,
+                      cx * math.sin(angle) + cy * math.cos(angle) - img.height / 2)
+
+    if layer['opacity'] < 1:
+        img.putalpha(img.getchannel('A').point(lambda a: round(a * layer['opacity'])))
+    return img, offset
+
+def paste_layer(canvas, img, left, top):
+    """Alpha-composite img onto canvas at (left, top), clipping whatever falls outside"""
+    box = (max(left, 0), max(top, 0), min(left + img.width, canvas.width), min(top + img.height, canvas.height))
+    if box[0] >= box[2] or box[1] >= box[3]:
+        return
+    canvas.alpha_composite(img, dest=box[:2],
+                           source=(box[0] - left, box[1] - top, box[2] - left, box[3] - top))
+
+def layer_key(cache, layer, width):
+    """Cache key of a rendered layer: the file's content plus everything that changes its pixels"""
+    return cache.key(Path(layer['file']), layer['cover'], layer.get('scale'), layer.get('rotation'),
+                     layer['opacity'], width)
+
+def compose_raster(layers, width=CARD_SIZE[0], layer_cache=None, size=CARD_SIZE):
+    """Flatten layers into one RGB image `width` pixels wide
+
+    Rendered layers go through layer_cache (a render_cache.LayerCache) when
+    given, so a batch sharing backgrounds and decorations rasterizes each
+    of them once.
+    """
+    factor = width / size[0]
+    canvas = Image.new('RGBA', (width, round(size[1] * factor)), (255, 255, 255, 255))
+    for layer in layers:
+        if layer_cache is None:
+            img, offset = render_layer(layer, factor, size)
+        else:
+            img, offset = layer_cache.fetch(layer_key(layer_cache, layer, width),
+                                            lambda: render_layer(layer, factor, size))
+        paste_layer(canvas, img, round(layer.get('x', 0) * factor + offset[0]),
+                    round(layer.get('y', 0) * factor + offset[1]))
+    return canvas.convert('RGB')
+
+def flatten_template(layers, width=CARD_SIZE[0], layer_cache=None, composite_cache=None):
+    """compose_raster, reusing the result for every template with the same layers
+    
+    The image may be shared through composite_cache, so copy it before
+    drawing on it.
+    """
+    if composite_cache is None or layer_cache is None:
+        return compose_raster(layers, width, layer_cache)
+    key = composite_cache.key([layer_key(layer_cache, layer, width) for layer in layers], width)
+    img, _ = composite_cache.fetch(key, lambda: (compose_raster(layers, width, layer_cache), None))
+    return img
+
+def save_raster(img, output_path, fmt):
+    """Write a composited image in one of the raster FORMATS"""
+    if fmt == 'png':
+        img.save(output_path, 'PNG', optimize=True)
+    else:
+        img.save(output_path, FORMATS[fmt], quality=RASTER_QUALITY)
+
+def compose_invitation(config, template, output_path, fmt='png', width=CARD_SIZE[0],
+                       elements_dir=ELEMENTS_DIR, layer_cache=None, composite_cache=None):
+    """Composite one template and write it to output_path in fmt"""
+    layers = plan_layers(config, template, elements_dir)
+    if fmt == 'svg':
+        data = compose_svg(layers)
+        with open(output_path, 'wb') as f:
+            f.write(data)
+        return
+    save_raster(flatten_template(layers, width, layer_cache, composite_cache), output_path, fmt)
+
+def slugify(name):
+    """File-name-safe version of a template name"""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'invitation'
+
+# Per-process state for batch workers, set up once by _init_worker
+_worker = {}
+
+def _init_worker(config_path, elements_dir, fmt, width, cache_dir, cache_limit):
+    """Load the config once per worker and open its caches"""
+    _worker.update(config=load_config(config_path)[0], elements_dir=elements_dir, fmt=fmt, width=width,
+                   layer_cache=LayerCache(cache_dir, disk_limit=cache_limit),
+                   composite_cache=LayerCache(memory_limit=COMPOSITE_MEMORY_LIMIT))
+
+def _warm_task(layer):
+    """Worker entry point for the warm-up: make sure one layer is in the disk cache"""
+    cache = _worker['layer_cache']
+    misses = cache.misses
+    try:
+        cache.fetch(layer_key(cache, layer, _worker['width']),
+                    lambda: render_layer(layer, _worker['width'] / CARD_SIZE[0]))
+    except Exception:
+        return 0  # the invitations using it will report the error
+    return cache.misses - misses
+
+def _compose_task(job):
+    """Worker entry point; errors are returned so one bad template doesn't stop the batch
+    
+    Also returns how many layers had to be rasterized for this job, or 0
+    when it failed.
+    """
+    name, template, output_path = job
+    misses = _worker['layer_cache'].misses
+    try:
+        compose_invitation(_worker['config'], template, output_path, _worker['fmt'], _worker['width'],
+                           _worker['elements_dir'], _worker['layer_cache'], _worker['composite_cache'])
+    except Exception as e:
+        return name, output_path, str(e), 0
+    return name, output_path, None, _worker['layer_cache'].misses - misses
+
+def distinct_layers(config, templates, width, elements_dir=ELEMENTS_DIR):
+    """Every differently rendered layer used by the templates, each listed once"""
+    keys = LayerCache(memory_limit=0)
+    layers = {}
+    for _, template in templates:
+        try:
+            planned = plan_layers(config, template, elements_dir)
+        except ValueError:
+            continue
+        for layer in planned:
+            layers.setdefault(layer_key(keys, layer, width), layer)
+    return list(layers.values())
+
+def needs_cairosvg(config, templates, elements_dir=ELEMENTS_DIR):
+    """(file, reason) for every layer file of the templates the built-in rasterizer can't draw"""
+    files = {}
+    for layer in distinct_layers(config, templates, CARD_SIZE[0], elements_dir):
+        files.setdefault(layer['file'], None)
+    unsupported = []
+    for path in files:
+        try:
+            # A tiny render is enough to meet every element and paint
+            rasterize(path, 8, 8)
+        except UnsupportedSVG as e:
+            unsupported.append((path, str(e)))
+    return unsupported
+
+def compose_batch(templates, output_dir, fmt='png', width=CARD_SIZE[0], workers=1,
+                  config_path=ELEMENTS_CONFIG_PATH, elements_dir=ELEMENTS_DIR, cache_dir=None,
+                  cache_limit=None):
+    """Composite (name, template) pairs into output_dir
+    
+    With several workers and a cache_dir, every distinct layer is first
+    rasterized once into the shared disk cache, so workers only ever read
+    layers back and nothing is rendered twice. Returns the failed names.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    extension = 'jpg' if fmt == 'jpeg' else fmt
+    jobs = [(name, template, os.path.join(output_dir, f"{slugify(name)}.{extension}"))
+            for name, template in templates]
+    initargs = (config_path, elements_dir, fmt, width, cache_dir, cache_limit or DISK_LIMIT)
+
+    failed = []
+    rasterized = 0
+    executor = None
+    if workers > 1 and len(jobs) > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs)
+        if fmt != 'svg' and cache_dir:
+            layers = distinct_layers(load_config(config_path)[0], templates, width, elements_dir)
+            rasterized += sum(executor.map(_warm_task, layers))
+        # Chunks keep per-job overhead small when there are thousands of guests
+        results = executor.map(_compose_task, jobs, chunksize=max(1, min(64, len(jobs) // (workers * 4))))
+    else:
+        _init_worker(*initargs)
+        results = map(_compose_task, jobs)
+    try:
+        for name, path, error, misses in results:
+            rasterized += misses
+            if error is None:
+                print(f"Composed: {path}")
+            else:
+                failed.append(name)
+                print(f"Error composing {name}: {error}")
+    finally:
+        if executor:
+            executor.shutdown()
+    if fmt != 'svg':
+        print(f"Rasterized {rasterized} layers")
+    return failed
+
+def read_templates(path):
+    """Read (name, template) pairs from a JSON Lines file, one template per line"""
+    templates = []
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                template = json.loads(line)
+                templates.append((template.get('name', f"invitation-{number}"), template))
+    return templates
+
+def parse_args(argv=None, prog=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(prog=prog, description="Flatten invitation layers into single images")
+    parser.add_argument('--templates', metavar='FILE',
+                        help="JSON Lines file of templates (default: SLIDESHOW_COMBINATIONS from the config)")
+    parser.add_argument('--format', choices=list(FORMATS),
+                        help="output format; raster formats use cairosvg when installed, else the "
+                             "built-in rasterizer, which can't draw gradients or arcs "
+                             "(default: png, or svg without cairosvg)")
+    parser.add_argument('--width', type=int, default=CARD_SIZE[0],
+                        help=f"raster width in pixels (default: {CARD_SIZE[0]})")
+    parser.add_argument('--out', default=os.path.join("invites", "composed"),
+                        help="output directory (default: invites/composed)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument('--cache-dir',
+                        help=f"where rasterized layers are kept between workers and runs "
+                             f"(default: {CACHE_DIR_NAME} in the output directory)")
+    parser.add_argument('--cache-size', type=int, default=DISK_LIMIT // (1024 * 1024), metavar='MB',
+                        help=f"size the layer cache is trimmed to (default: {DISK_LIMIT // (1024 * 1024)})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="keep rasterized layers in memory only")
+    parser.add_argument('--config', default=ELEMENTS_CONFIG_PATH,
+                        help=f"elements config to read (default: {ELEMENTS_CONFIG_PATH})")
+    parser.add_argument('--elements', default=ELEMENTS_DIR,
+                        help=f"elements directory holding the SVGs (default: {ELEMENTS_DIR})")
+    return parser.parse_args(argv)
+
+def main(argv=None, prog=None):
+    """Composite every template"""
+    args = parse_args(argv, prog)
+    workers = args.workers or os.cpu_count() or 1
+    if args.templates:
+        templates = read_templates(args.templates)
+    else:
+        templates = [(combination['name'], combination) for combination in load_config(args.config)[1]]
+
+    cache_dir = None if args.no_cache else args.cache_dir or os.path.join(args.out, CACHE_DIR_NAME)
+    fmt = args.format or default_format()
+    if args.format is None and fmt == 'svg':
+        print("cairosvg is not available, writing flattened SVGs (pass --format to rasterize anyway)")
+
+    start_time = time.time()
+    failed = compose_batch(templates, args.out, fmt, args.width, workers, args.config, args.elements,
+                           cache_dir, args.cache_size * 1024 * 1024)
+    duration = time.time() - start_time
+    print(f"\nComposed {len(templates) - len(failed)} of {len(templates)} invitations "
+          f"in {duration:.2f} seconds")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,508 @@
+"""
+Generate 200 distinct SVG decorations for the event card generator
+"""
+
+import gzip
+import math
+import random
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+from .common import asset_seed, load_manifest, save_manifest
+from .scene import Scene, to_svg
+
+# Color palettes for different themes
+COLORS = {
+    'warm': ['#FF6B6B', '#FF8E8E', '#FFB3B3', '#FFD93D', '#FFE66D', '#FF6B9D'],
+    'cool': ['#4ECDC4', '#45B7D1', '#96CEB4', '#6C5CE7', '#A29BFE', '#74B9FF'],
+    'neutral': ['#636E72', '#B2BEC3', '#DFE6E9', '#2D3436', '#636E72', '#B2BEC3'],
+    'pastel': ['#FFB3BA', '#BAFFC9', '#BAE1FF', '#FFFFBA', '#FFB3F7', '#B3F7FF']
+}
+
+def create_circle_pattern(colors):
+    """Create circle-based pattern"""
+    scene = Scene(100, 100)
+    for i in range(random.randint(3, 8)):
+        x = random.randint(10, 90)
+        y = random.randint(10, 90)
+        r = random.randint(3, 12)
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        scene.circle(x, y, r, fill=color, opacity=round(opacity, 2))
+    return scene
+
+def create_geometric_pattern(colors):
+    """Create geometric pattern"""
+    scene = Scene(100, 100)
+    shapes = ['rect', 'polygon', 'ellipse']
+    for i in range(random.randint(4, 7)):
+        shape = random.choice(shapes)
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        
+        if shape == 'rect':
+            x = random.randint(5, 80)
+            y = random.randint(5, 80)
+            w = random.randint(8, 20)
+            h = random.randint(8, 20)
+            rotation = random.randint(0, 360)
+            scene.rect(x, y, w, h, rotate=rotation, fill=color, opacity=round(opacity, 2))
+        elif shape == 'polygon':
+            points = []
+            for j in range(3):
+                x = random.randint(10, 90)
+                y = random.randint(10, 90)
+                points.append((x, y))
+            scene.polygon(points, fill=color, opacity=round(opacity, 2))
+        elif shape == 'ellipse':
+            cx = random.randint(15, 85)
+            cy = random.randint(15, 85)
+            rx = random.randint(8, 20)
+            ry = random.randint(5, 15)
+            scene.ellipse(cx, cy, rx, ry, fill=color, opacity=round(opacity, 2))
+    
+    return scene
+
+def create_organic_pattern(colors):
+    """Create organic, flowing pattern"""
+    scene = Scene(100, 100)
+    
+    # Create flowing curves
+    for i in range(random.randint(2, 4)):
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        
+        # Generate random control points for curves
+        x1 = random.randint(10, 30)
+        y1 = random.randint(20, 80)
+        x2 = random.randint(70, 90)
+        y2 = random.randint(20, 80)
+        cx1 = random.randint(30, 50)
+        cy1 = random.randint(10, 40)
+        cx2 = random.randint(50, 70)
+        cy2 = random.randint(60, 90)
+        
+        scene.quad(x1, y1, cx1, cy1, x2, y2, stroke=color,
+                   stroke_width=random.randint(2, 6), opacity=round(opacity, 2))
+    
+    # Add some organic shapes
+    for i in range(random.randint(2, 4)):
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        x = random.randint(15, 85)
+        y = random.randint(15, 85)
+        r = random.randint(5, 15)
+        scene.circle(x, y, r, fill=color, opacity=round(opacity, 2))
+    
+    return scene
+
+def create_star_pattern(colors):
+    """Create star-based pattern"""
+    scene = Scene(100, 100)
+    
+    def add_star(cx, cy, r, color, opacity):
+        points = []
+        for i in range(10):
+            angle = i * 36 * 3.14159 / 180
+            if i % 2 == 0:
+                radius = r
+            else:
+                radius = r * 0.5
+            x = cx + radius * math.cos(angle)
+            y = cy + radius * math.sin(angle)
+            points.append((round(x, 1), round(y, 1)))
+        scene.polygon(points, fill=color, opacity=round(opacity, 2))
+    
+    for i in range(random.randint(3, 6)):
+        x = random.randint(15, 85)
+        y = random.randint(15, 85)
+        r = random.randint(5, 12)
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        add_star(x, y, r, color, opacity)
+    
+    return scene
+
+def create_abstract_pattern(colors):
+    """Create abstract artistic pattern"""
+    scene = Scene(100, 100)
+    
+    # Create abstract shapes
+    for i in range(random.randint(3, 6)):
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        
+        # Random abstract path
+        x1 = random.randint(10, 90)
+        y1 = random.randint(10, 90)
+        x2 = random.randint(10, 90)
+        y2 = random.randint(10, 90)
+        x3 = random.randint(10, 90)
+        y3 = random.randint(10, 90)
+        
+        scene.quad(x1, y1, x2, y2, x3, y3, stroke=color,
+                   stroke_width=random.randint(3, 8), opacity=round(opacity, 2))
+    
+    # Add some geometric elements
+    for i in range(random.randint(2, 4)):
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        x = random.randint(15, 85)
+        y = random.randint(15, 85)
+        size = random.randint(8, 20)
+        scene.rect(x, y, size, size, rotate=random.randint(0, 45), fill=color, opacity=round(opacity, 2))
+    
+    return scene
+
+def create_celebration_pattern(colors):
+    """Create celebration-themed pattern"""
+    scene = Scene(100, 100)
+    
+    # Confetti pieces
+    for i in range(random.randint(8, 15)):
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        x = random.randint(5, 95)
+        y = random.randint(5, 95)
+        w = random.randint(2, 6)
+        h = random.randint(2, 6)
+        rotation = random.randint(0, 360)
+        scene.rect(x, y, w, h, rotate=rotation, fill=color, opacity=round(opacity, 2))
+    
+    # Streamers
+    for i in range(random.randint(2, 4)):
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        x1 = random.randint(10, 90)
+        y1 = random.randint(10, 30)
+        x2 = random.randint(10, 90)
+        y2 = random.randint(70, 90)
+        scene.line(x1, y1, x2, y2, stroke=color,
+                   stroke_width=random.randint(2, 5), opacity=round(opacity, 2))
+    
+    return scene
+
+def create_nature_pattern(colors):
+    """Create nature-inspired pattern"""
+    scene = Scene(100, 100)
+    
+    # Leaf-like shapes
+    for i in range(random.randint(3, 6)):
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        x = random.randint(15, 85)
+        y = random.randint(15, 85)
+        size = random.randint(8, 20)
+        
+        # Simple leaf shape
+        scene.ellipse(x, y, size, size/2, rotate=random.randint(0, 360), fill=color, opacity=round(opacity, 2))
+    
+    # Flower-like shapes
+    for i in range(random.randint(2, 4)):
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        x = random.randint(20, 80)
+        y = random.randint(20, 80)
+        r = random.randint(6, 15)
+        
+        # Simple flower with petals
+        for j in range(6):
+            angle = j * 60 * 3.14159 / 180
+            petal_x = x + r * math.cos(angle)
+            petal_y = y + r * math.sin(angle)
+            petal_r = r * 0.4
+            scene.circle(round(petal_x, 1), round(petal_y, 1), petal_r,
+                         fill=color, opacity=round(opacity, 2))
+        
+        # Center
+        scene.circle(x, y, r*0.3, fill=random.choice(colors), opacity=round(opacity, 2))
+    
+    return scene
+
+def create_tech_pattern(colors):
+    """Create technology-themed pattern"""
+    scene = Scene(100, 100)
+    
+    # Circuit-like lines
+    for i in range(random.randint(4, 8)):
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        
+        # Horizontal or vertical lines
+        if random.choice([True, False]):
+            x1 = random.randint(10, 90)
+            y1 = random.randint(10, 90)
+            x2 = random.randint(10, 90)
+            y2 = y1
+        else:
+            x1 = random.randint(10, 90)
+            y1 = random.randint(10, 90)
+            x2 = x1
+            y2 = random.randint(10, 90)
+        
+        scene.line(x1, y1, x2, y2, stroke=color,
+                   stroke_width=random.randint(1, 3), opacity=round(opacity, 2))
+    
+    # Connection points
+    for i in range(random.randint(3, 6)):
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        x = random.randint(15, 85)
+        y = random.randint(15, 85)
+        r = random.randint(2, 5)
+        scene.circle(x, y, r, fill=color, opacity=round(opacity, 2))
+    
+    return scene
+
+# Fixed curves for create_vintage_pattern as (x0, y0, x1, y1, x2, y2) quadratics:
+# four borders, then four corner flourishes
+VINTAGE_BORDERS = [(10, 10, 50, 20, 90, 10), (90, 10, 80, 50, 90, 90),
+                   (90, 90, 50, 80, 10, 90), (10, 90, 20, 50, 10, 10)]
+VINTAGE_FLOURISHES = [(15, 15, 25, 25, 15, 35), (85, 15, 75, 25, 85, 35),
+                      (85, 85, 75, 75, 85, 65), (15, 85, 25, 75, 15, 65)]
+
+def create_vintage_pattern(colors):
+    """Create vintage/retro pattern"""
+    scene = Scene(100, 100)
+    
+    # Ornate borders (top, right, bottom, left), then corner flourishes
+    for curve in VINTAGE_BORDERS + VINTAGE_FLOURISHES:
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        scene.quad(*curve, stroke=color, stroke_width=random.randint(2, 4), opacity=round(opacity, 2))
+    
+    return scene
+
+def create_minimal_pattern(colors):
+    """Create minimal, clean pattern"""
+    scene = Scene(100, 100)
+    
+    # Simple, clean shapes
+    for i in range(random.randint(2, 4)):
+        color = random.choice(colors)
+        opacity = random.uniform(0.7, 0.9)
+        
+        if random.choice([True, False]):
+            # Circle
+            x = random.randint(20, 80)
+            y = random.randint(20, 80)
+            r = random.randint(8, 20)
+            scene.circle(x, y, r, fill=color, opacity=round(opacity, 2))
+        else:
+            # Rectangle
+            x = random.randint(20, 70)
+            y = random.randint(20, 70)
+            w = random.randint(15, 30)
+            h = random.randint(15, 30)
+            scene.rect(x, y, w, h, fill=color, opacity=round(opacity, 2))
+    
+    return scene
+
+def create_playful_pattern(colors):
+    """Create playful, fun pattern"""
+    scene = Scene(100, 100)
+    
+    # Fun shapes
+    for i in range(random.randint(4, 7)):
+        color = random.choice(colors)
+        opacity = random.uniform(0.6, 0.9)
+        
+        shape_type = random.choice(['circle', 'star', 'triangle', 'diamond'])
+        
+        if shape_type == 'circle':
+            x = random.randint(15, 85)
+            y = random.randint(15, 85)
+            r = random.randint(5, 15)
+            scene.circle(x, y, r, fill=color, opacity=round(opacity, 2))
+        elif shape_type == 'star':
+            # Simple star
+            x = random.randint(20, 80)
+            y = random.randint(20, 80)
+            r = random.randint(8, 15)
+            points = []
+            for j in range(5):
+                angle = j * 72 * 3.14159 / 180
+                px = x + r * math.cos(angle)
+                py = y + r * math.sin(angle)
+                points.append((round(px, 1), round(py, 1)))
+            scene.polygon(points, fill=color, opacity=round(opacity, 2))
+        elif shape_type == 'triangle':
+            x = random.randint(20, 80)
+            y = random.randint(20, 80)
+            size = random.randint(8, 20)
+            scene.polygon([(x, y-size), (x-size, y+size), (x+size, y+size)], fill=color, opacity=round(opacity, 2))
+        elif shape_type == 'diamond':
+            x = random.randint(20, 80)
+            y = random.randint(20, 80)
+            size = random.randint(8, 20)
+            scene.polygon([(x, y-size), (x+size, y), (x, y+size), (x-size, y)], fill=color, opacity=round(opacity, 2))
+    
+    return scene
+
+# Pattern generators; each takes a theme's colors and returns a Scene
+PATTERN_GENERATORS = [
+    create_circle_pattern,
+    create_geometric_pattern,
+    create_organic_pattern,
+    create_star_pattern,
+    create_abstract_pattern,
+    create_celebration_pattern,
+    create_nature_pattern,
+    create_tech_pattern,
+    create_vintage_pattern,
+    create_minimal_pattern,
+    create_playful_pattern
+]
+
+# Number of decorations produced by a full run
+TOTAL_DECORATIONS = 200
+
+# Name mixed into per-asset seeds so decorations and backgrounds never share a stream
+GENERATOR_NAME = "decorations"
+
+# Categories for organization
+CATEGORIES = [
+    "geometric", "organic", "celebration", "nature", "tech", 
+    "vintage", "minimal", "playful", "abstract", "artistic"
+]
+
+# Bump whenever the SVG output changes so the manifest rebuilds everything
+GENERATOR_VERSION = 4
+
+# Build manifest kept next to the outputs
+MANIFEST_NAME = ".build-manifest.json"
+
+def choose_style():
+    """Pick category, generator and color theme from the current RNG state"""
+    category = random.choice(CATEGORIES)
+    generator = random.choice(PATTERN_GENERATORS)
+    color_theme = random.choice(list(COLORS.keys()))
+    return category, generator, color_theme
+
+def compressed_siblings(filepath):
+    """Paths of the pre-compressed copies written next to an SVG"""
+    return [filepath.with_name(filepath.name + '.gz'), filepath.with_suffix('.svgz')]
+
+def generate_decorations(master_seed=None, indices=None, force=False,
+                         minify=True, precision=2, compress=False):
+    """Generate 200 distinct SVG decorations
+    
+    With a master_seed every decoration is seeded from (seed, index), so a
+    rerun writes byte-identical files and any index can be redone alone.
+    A build manifest records each decoration's inputs; decorations whose
+    seed, generator, palette colors, output options and version are
+    unchanged are skipped unless force is set.
+    
+    Each generator draws a Scene, which scene.to_svg() writes; minify and
+    precision are passed to its SVGWriter, and compress also writes
+    gzipped .svg.gz and .svgz copies of every decoration.
+    """
+    decorations_dir = Path("elements/decorations")
+    decorations_dir.mkdir(exist_ok=True)
+    manifest_path = decorations_dir / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+    assets = manifest['assets']
+    
+    # Reuse the last run's seed by default so an unchanged tree is a no-op
+    if master_seed is None:
+        master_seed = manifest['seed']
+    if master_seed is None:
+        master_seed = random.SystemRandom().randrange(2**32)
+    manifest['seed'] = master_seed
+    if indices is None:
+        indices = range(1, TOTAL_DECORATIONS + 1)
+    print(f"Master seed: {master_seed}")
+    
+    # Generate decorations
+    generated = 0
+    for i in indices:
+        seed = asset_seed(GENERATOR_NAME, master_seed, i)
+        random.seed(seed)
+        
+        # Choose random category and generator
+        category, generator, color_theme = choose_style()
+        
+        # Generate unique name
+        name = f"decoration-{i:03d}-{category}"
+        filename = f"{name}.svg"
+        filepath = decorations_dir / filename
+        
+        # Skip decorations whose inputs match the last build
+        params = {
+            'seed': seed,
+            'generator': generator.__name__,
+            'colors': COLORS[color_theme],
+            'version': GENERATOR_VERSION,
+            'minify': minify,
+            'precision': precision,
+            'compress': compress,
+        }
+        input_hash = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+        previous = assets.get(str(i))
+        if (not force and previous and previous['input_hash'] == input_hash
+                and filepath.exists() and filepath.stat().st_size == previous['size']):
+            continue
+        
+        # Stream the SVG straight to disk (fixed newlines keep output identical across platforms)
+        scene = generator(COLORS[color_theme])
+        with open(filepath, 'w', newline='\n') as f:
+            to_svg(scene, f, minify=minify, precision=precision)
+        
+        if previous and previous['file'] != filename:
+            old_path = decorations_dir / previous['file']
+            for path in [old_path] + compressed_siblings(old_path):
+                path.unlink(missing_ok=True)
+        data = filepath.read_bytes()
+        
+        # mtime=0 keeps the gzip header, and so the bytes, identical between runs
+        for path in compressed_siblings(filepath):
+            if compress:
+                path.write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+            else:
+                path.unlink(missing_ok=True)
+        assets[str(i)] = {
+            'file': filename,
+            'params': params,
+            'input_hash': input_hash,
+            'output_hash': hashlib.sha256(data).hexdigest(),
+            'size': len(data),
+        }
+        
+        generated += 1
+        print(f"Generated {filename}")
+    
+    save_manifest(manifest_path, manifest)
+    print(f"\nGenerated {generated} decorations in {decorations_dir}")
+
+def parse_args(argv=None, prog=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(prog=prog, description="Generate 200 SVG decorations for event cards")
+    parser.add_argument('--seed', type=int,
+                        help="master seed; reruns with the same seed write byte-identical files")
+    parser.add_argument('--index', type=int, action='append', dest='indices', metavar='N',
+                        help=f"only (re)generate decoration N (1-{TOTAL_DECORATIONS}); repeatable")
+    parser.add_argument('--force', action='store_true',
+                        help="regenerate every decoration even if the manifest says it is current")
+    parser.add_argument('--pretty', action='store_false', dest='minify',
+                        help="write indented, unminified SVG")
+    parser.add_argument('--precision', type=int, default=2,
+                        help="decimal places kept in minified numbers (default: 2)")
+    parser.add_argument('--gzip', action='store_true', dest='compress',
+                        help="also write pre-compressed .svg.gz and .svgz copies")
+    parser.add_argument('--atlas', action='store_true',
+                        help="pack all decorations into atlas.svg afterwards (see the atlas command)")
+    return parser.parse_args(argv)
+
+def main(argv=None, prog=None):
+    """Generate the decorations, then pack the atlas if asked"""
+    args = parse_args(argv, prog)
+    generate_decorations(args.seed, sorted(set(args.indices)) if args.indices else None, args.force,
+                         minify=args.minify, precision=args.precision, compress=args.compress)
+    if args.atlas:
+        from .atlas import pack_atlas
+        pack_atlas()
+
+if __name__ == "__main__":
+    main()
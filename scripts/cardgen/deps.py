@@ -0,0 +1,85 @@
+"""
+Cached check that the packages in config/requirements.txt are installed
+
+The wrappers used to run `pip install -r requirements.txt` on every call,
+which costs seconds even when nothing is missing. Now a stamp file records
+that the requirements were satisfied for this interpreter and this
+version of the requirements file. While the stamp exists the check is a
+single stat; only when the file or the interpreter changes are the
+packages looked up again (and installed, if asked).
+"""
+
+import os
+import re
+import sys
+import hashlib
+import subprocess
+
+REQUIREMENTS_PATH = os.path.join("config", "requirements.txt")
+
+def cache_dir():
+    """Per-user cache directory for the stamp files"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA')
+    return os.path.join(base or os.path.join(os.path.expanduser('~'), '.cache'), 'cardgen')
+
+def stamp_path(requirements):
+    """Stamp file for this requirements text and interpreter"""
+    key = hashlib.sha256(f"{sys.executable}\n{sys.version}\n{requirements}".encode()).hexdigest()
+    return os.path.join(cache_dir(), f"deps-{key[:16]}")
+
+def requirement_names(requirements):
+    """Distribution names in requirements text, without versions, extras or markers"""
+    names = []
+    for line in requirements.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line and not line.startswith('-'):
+            names.append(re.match(r'[A-Za-z0-9._-]+', line).group())
+    return names
+
+def missing_requirements(names):
+    """The names that have no installed distribution"""
+    from importlib import metadata
+    missing = []
+    for name in names:
+        try:
+            metadata.version(name)
+        except metadata.PackageNotFoundError:
+            missing.append(name)
+    return missing
+
+def check_dependencies(path=REQUIREMENTS_PATH, install=False):
+    """Return the requirements that are missing, installing them first if asked
+
+    An empty result is remembered until the requirements file or the
+    interpreter changes. Version bounds aren't compared; pip enforces
+    them when it installs.
+    """
+    with open(path, encoding='utf-8') as f:
+        requirements = f.read()
+    stamp = stamp_path(requirements)
+    if os.path.exists(stamp):
+        return []
+    missing = missing_requirements(requirement_names(requirements))
+    if missing and install:
+        print(f"Installing {', '.join(missing)}...")
+        subprocess.run([sys.executable, '-m', 'pip', 'install', '-r', path], check=False)
+        missing = missing_requirements(missing)
+    if not missing:
+        os.makedirs(os.path.dirname(stamp), exist_ok=True)
+        with open(stamp, 'w') as f:
+            f.write(requirements)
+    return missing
+
+def main(argv=None, prog=None):
+    """Check (and optionally install) the requirements; exits 1 if any are missing"""
+    import argparse
+    parser = argparse.ArgumentParser(prog=prog, description="Check that the Python requirements are installed")
+    parser.add_argument('--requirements', default=REQUIREMENTS_PATH,
+                        help=f"requirements file (default: {REQUIREMENTS_PATH})")
+    parser.add_argument('--install', action='store_true',
+                        help="pip install the requirements if any are missing")
+    args = parser.parse_args(argv)
+    missing = check_dependencies(args.requirements, args.install)
+    if missing:
+        print(f"Missing packages: {', '.join(missing)} (pip install -r {args.requirements})")
+        sys.exit(1)
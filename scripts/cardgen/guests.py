@@ -0,0 +1,304 @@
+"""
+Render a personalized invitation for every guest in a CSV or JSON Lines list
+
+Guests are streamed through four stages: template selection, text layout,
+compositing over the template's shared layers, and encoding. The CPU
+stages run in a process pool fed through a bounded window of chunks, so
+only O(workers) guests are in memory however long the list is.
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
+from PIL import ImageDraw, ImageFont
+
+from .common import ELEMENTS_CONFIG_PATH, ELEMENTS_DIR
+from .compositor import (CARD_SIZE, CACHE_DIR_NAME, COMPOSITE_MEMORY_LIMIT, load_config, read_templates,
+                         plan_layers, flatten_template, save_raster, distinct_layers, slugify,
+                         cairosvg_available, needs_cairosvg, _warm_task, _worker)
+from .render_cache import DISK_LIMIT, LayerCache
+
+# Text blocks from the top of the card down, mirroring the builder's layout:
+# (field, font size in card units, color, uppercase, space above)
+HEADER_LAYOUT = [
+    ('guest', 30, 'accent2', False, 70),
+    ('pill', 20, 'accent2', True, 24),
+    ('title', 96, 'accent', False, 28),
+    ('subtitle', 24, 'accent2', True, 14),
+    ('names', 44, 'accent', False, 26),
+]
+
+# ...and from the bottom of the card up
+FOOTER_LAYOUT = [
+    ('rsvp', 22, 'accent2', False, 70),
+    ('location', 26, 'accent', False, 16),
+    ('time', 28, 'accent', False, 12),
+    ('date', 32, 'accent', False, 12),
+]
+
+# Fields set in the title font; everything else uses the body font
+TITLE_FIELDS = ('title', 'names')
+
+DEFAULT_COLORS = {'accent': '#222222', 'accent2': '#555555'}
+
+# Horizontal space kept clear on each side of the text, in card units
+TEXT_MARGIN = 90
+LINE_SPACING = 1.2
+
+# Guests per task; larger chunks amortize inter-process overhead
+CHUNK_SIZE = 8
+
+FORMATS = ('jpeg', 'png', 'webp')
+
+def read_guests(path):
+    """Yield guest rows from a .csv file or a JSON Lines file, one at a time"""
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+class GuestFields(dict):
+    """Row lookup for str.format_map that leaves unknown {placeholders} empty"""
+
+    def __missing__(self, key):
+        return ''
+
+def choose_template(guest, templates):
+    """Pick the guest's template by its "template" column, else stably by hash
+
+    Hashing the row keeps each guest on the same template across reruns
+    without anyone having to assign them.
+    """
+    wanted = guest.get('template')
+    if wanted:
+        for name, template in templates:
+            if slugify(name) == slugify(wanted):
+                return template
+        raise ValueError(f"Unknown template '{wanted}'")
+    digest = hashlib.sha256(json.dumps(guest, sort_keys=True).encode()).digest()
+    return templates[int.from_bytes(digest[:8], 'big') % len(templates)][1]
+
+def guest_text(guest, template):
+    """The text of every layout field for one guest
+
+    Guest columns win over the template's "text" defaults; template text
+    may use {column} placeholders, e.g. "guest": "Dear {name}".
+    """
+    fields = GuestFields(guest)
+    text = {}
+    for field, *_ in HEADER_LAYOUT + FOOTER_LAYOUT:
+        value = guest.get(field) or str(template.get('text', {}).get(field, '')).format_map(fields)
+        text[field] = str(value).strip()
+    if not text['guest'] and guest.get('name'):
+        text['guest'] = str(guest['name'])
+    return text
+
+@lru_cache(maxsize=64)
+def load_font(path, size):
+    """A FreeType font at size pixels; Pillow's built-in font when path is None"""
+    return ImageFont.truetype(path, size) if path else ImageFont.load_default(size=size)
+
+def wrap_text(text, font, width):
+    """Greedy word wrap to lines no wider than width pixels"""
+    lines = []
+    line = ''
+    for word in text.split():
+        candidate = f"{line} {word}" if line else word
+        if line and font.getlength(candidate) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    if line:
+        lines.append(line)
+    return lines
+
+def layout_text(img, text, colors, fonts):
+    """Draw the header and footer text blocks centered on the card"""
+    draw = ImageDraw.Draw(img)
+    factor = img.width / CARD_SIZE[0]
+    center = img.width / 2
+    wrap_width = img.width - 2 * TEXT_MARGIN * factor
+
+    def lines(field, size, uppercase):
+        font = load_font(fonts['title'] if field in TITLE_FIELDS else fonts['body'], max(round(size * factor), 1))
+        value = text[field].upper() if uppercase else text[field]
+        return font, wrap_text(value, font, wrap_width)
+
+    y = 0
+    for field, size, color, uppercase, space in HEADER_LAYOUT:
+        if text[field]:
+            font, wrapped = lines(field, size, uppercase)
+            y += space * factor
+            for line in wrapped:
+                draw.text((center, y), line, font=font, fill=colors[color], anchor='ma')
+                y += font.size * LINE_SPACING
+
+    y = img.height
+    for field, size, color, uppercase, space in FOOTER_LAYOUT:
+        if text[field]:
+            font, wrapped = lines(field, size, uppercase)
+            y -= space * factor
+            for line in reversed(wrapped):
+                draw.text((center, y), line, font=font, fill=colors[color], anchor='md')
+                y -= font.size * LINE_SPACING
+
+def render_guest(number, guest, output_dir, fmt='jpeg', width=CARD_SIZE[0]):
+    """Run one guest through every stage in the current worker; returns the written path"""
+    template = choose_template(guest, _worker['templates'])
+    layers = plan_layers(_worker['config'], template, _worker['elements_dir'])
+    # The flattened template is shared, so draw on a copy
+    img = flatten_template(layers, width, _worker['layer_cache'], _worker['composite_cache']).copy()
+    layout_text(img, guest_text(guest, template), {**DEFAULT_COLORS, **template.get('colors', {})},
+                _worker['fonts'])
+    label = guest.get('id') or guest.get('name') or 'guest'
+    output_path = os.path.join(output_dir, f"{number:06d}-{slugify(str(label))}.{'jpg' if fmt == 'jpeg' else fmt}")
+    save_raster(img, output_path, fmt)
+    return output_path
+
+def _init_worker(config_path, elements_dir, templates, width, cache_dir, cache_limit, fonts):
+    """Load the config, templates and caches once per worker"""
+    _worker.update(config=load_config(config_path)[0], elements_dir=elements_dir, templates=templates,
+                   width=width, fonts=fonts,
+                   layer_cache=LayerCache(cache_dir, disk_limit=cache_limit),
+                   composite_cache=LayerCache(memory_limit=COMPOSITE_MEMORY_LIMIT))
+
+def _render_task(task):
+    """Worker entry point: render a chunk of guests, returning (number, path, error) for each"""
+    chunk, output_dir, fmt, width = task
+    results = []
+    for number, guest in chunk:
+        try:
+            results.append((number, render_guest(number, guest, output_dir, fmt, width), None))
+        except Exception as e:
+            results.append((number, None, str(e)))
+    return results
+
+def chunked(rows, size):
+    """Group (number, row) pairs into lists of up to size, lazily"""
+    chunk = []
+    for number, row in enumerate(rows, 1):
+        chunk.append((number, row))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def render_guests(guests, templates, output_dir, fmt='jpeg', width=CARD_SIZE[0], workers=1,
+                  window=None, config_path=ELEMENTS_CONFIG_PATH, elements_dir=ELEMENTS_DIR, cache_dir=None,
+                  cache_limit=DISK_LIMIT, fonts=None, report=print):
+    """Render every guest in the iterable; returns (rendered, failed) counts
+
+    Guests are read lazily and at most `window` chunks (default 4 per
+    worker) are in flight, so memory stays flat for any list length.
+    Results are reported as chunks complete.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    fonts = fonts or {'title': None, 'body': None}
+    initargs = (config_path, elements_dir, templates, width, cache_dir, cache_limit, fonts)
+    tasks = ((chunk, output_dir, fmt, width) for chunk in chunked(guests, CHUNK_SIZE))
+    counts = {'rendered': 0, 'failed': 0}
+
+    def collect(results):
+        for number, path, error in results:
+            if error is None:
+                counts['rendered'] += 1
+            else:
+                counts['failed'] += 1
+                report(f"Error rendering guest {number}: {error}")
+        total = counts['rendered'] + counts['failed']
+        if total // 500 != (total - len(results)) // 500:
+            report(f"Progress: {total} invitations")
+
+    if workers <= 1:
+        _init_worker(*initargs)
+        for task in tasks:
+            collect(_render_task(task))
+        return counts['rendered'], counts['failed']
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+        if cache_dir:
+            # Rasterize every template's layers once up front; workers then only read them back
+            config = load_config(config_path)[0]
+            list(executor.map(_warm_task, distinct_layers(config, templates, width, elements_dir)))
+        pending = set()
+        for task in tasks:
+            pending.add(executor.submit(_render_task, task))
+            if len(pending) >= (window or workers * 4):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future.result())
+        for future in pending:
+            collect(future.result())
+    return counts['rendered'], counts['failed']
+
+def parse_args(argv=None, prog=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(prog=prog, description="Render one personalized invitation per guest")
+    parser.add_argument('guests', help="guest list, .csv or JSON Lines")
+    parser.add_argument('--templates', metavar='FILE',
+                        help="JSON Lines file of templates (default: SLIDESHOW_COMBINATIONS from the config)")
+    parser.add_argument('--format', choices=FORMATS, default='jpeg',
+                        help="output format (default: jpeg)")
+    parser.add_argument('--width', type=int, default=CARD_SIZE[0],
+                        help=f"output width in pixels (default: {CARD_SIZE[0]})")
+    parser.add_argument('--out', default=os.path.join("invites", "guests"),
+                        help="output directory (default: invites/guests)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="number of worker processes, 0 for one per CPU (default: 0)")
+    parser.add_argument('--window', type=int,
+                        help="chunks of guests in flight at once (default: 4 per worker)")
+    parser.add_argument('--font', help="TrueType font for body text (default: Pillow's built-in font)")
+    parser.add_argument('--title-font', help="TrueType font for the title and names (default: --font)")
+    parser.add_argument('--cache-dir',
+                        help=f"where rasterized layers are kept (default: {CACHE_DIR_NAME} in the output directory)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="keep rasterized layers in memory only")
+    parser.add_argument('--config', default=ELEMENTS_CONFIG_PATH,
+                        help=f"elements config to read (default: {ELEMENTS_CONFIG_PATH})")
+    parser.add_argument('--elements', default=ELEMENTS_DIR,
+                        help=f"elements directory holding the SVGs (default: {ELEMENTS_DIR})")
+    return parser.parse_args(argv)
+
+def main(argv=None, prog=None):
+    """Render the whole guest list"""
+    args = parse_args(argv, prog)
+    workers = args.workers or os.cpu_count() or 1
+    if args.templates:
+        templates = read_templates(args.templates)
+    else:
+        templates = [(combination['name'], combination) for combination in load_config(args.config)[1]]
+    cache_dir = None if args.no_cache else args.cache_dir or os.path.join(args.out, CACHE_DIR_NAME)
+    fonts = {'title': args.title_font or args.font, 'body': args.font}
+    if not cairosvg_available():
+        # Every guest would fail on the same layers, so stop before the pool starts
+        unsupported = needs_cairosvg(load_config(args.config)[0], templates, args.elements)
+        if unsupported:
+            files = "\n".join(f"  {path} ({reason})" for path, reason in unsupported)
+            sys.exit(f"These template layers need cairosvg, which can't be loaded:\n{files}\n"
+                     f"Install cairosvg and the cairo library (see config/requirements.txt), "
+                     f"or use --templates without them.")
+
+    start_time = time.time()
+    rendered, failed = render_guests(read_guests(args.guests), templates, args.out, args.format, args.width,
+                                     workers, args.window, args.config, args.elements, cache_dir,
+                                     fonts=fonts)
+    duration = time.time() - start_time
+    print(f"\nRendered {rendered} invitations in {duration:.2f} seconds "
+          f"({rendered / max(duration, 1e-9):.0f} per second)")
+    if failed:
+        print(f"{failed} guests failed")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""
+Rasterize the SVG subset the decoration generator writes, with PIL only
+
+Covers circle, ellipse, rect, polygon, polyline, line and path (M, L, H,
+V, Q, C and Z) elements, <g> groups with inherited presentation
+attributes, rotate/translate/scale/matrix transforms, and the
+<symbol>/<use> pairs of the sprite atlas. Each shape is drawn into a
+coverage mask over just its own bounding box, at SUPERSAMPLE times the
+resolution, box-reduced for antialiasing and composited at its opacity.
+No native SVG library or browser is involved.
+
+Anything outside the subset (gradients, arcs, text, images...) raises
+UnsupportedSVG, so callers can fall back to cairosvg for it.
+"""
+
+import re
+import math
+import time
+import argparse
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from PIL import Image, ImageChops, ImageColor, ImageDraw
+
+# Masks are drawn this many times larger and box-reduced, for antialiasing
+SUPERSAMPLE = 4
+
+# Most a flattened curve or circle may stray from the true outline, in mask pixels
+TOLERANCE = 1.0
+
+# Default edge of a thumbnail, in pixels
+THUMBNAIL_SIZE = 128
+
+# Attributes a child inherits from its <g>
+INHERITED = ('fill', 'fill-opacity', 'stroke', 'stroke-width', 'stroke-opacity')
+
+# Elements that never paint anything themselves
+SKIPPED = {'defs', 'symbol', 'view', 'title', 'desc', 'metadata', 'style'}
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+TRANSFORM_RE = re.compile(r'(\w+)\s*\(([^)]*)\)')
+NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+PATH_TOKEN_RE = re.compile(r'[A-Za-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+class UnsupportedSVG(ValueError):
+    """The document uses something outside the rasterizer's subset"""
+
+def local_name(tag):
+    """Tag without its {namespace}"""
+    return tag.rsplit('}', 1)[-1]
+
+def numbers(text):
+    return [float(value) for value in NUMBER_RE.findall(text or '')]
+
+def length(value, default=0.0):
+    """A plain or px length; percentages and other units aren't supported"""
+    if value is None:
+        return default
+    value = value.strip()
+    if value.endswith('px'):
+        value = value[:-2]
+    try:
+        return float(value)
+    except ValueError:
+        raise UnsupportedSVG(f"length {value!r}") from None
+
+def multiply(m, n):
+    """Affine matrix m applied after n, both as SVG (a, b, c, d, e, f)"""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (a * a2 + c * b2, b * a2 + d * b2, a * c2 + c * d2, b * c2 + d * d2,
+            a * e2 + c * f2 + e, b * e2 + d * f2 + f)
+
+def parse_transform(text):
+    """Matrix for a transform attribute"""
+    matrix = IDENTITY
+    for name, args in TRANSFORM_RE.findall(text or ''):
+        values = numbers(args)
+        if name == 'rotate':
+            angle = math.radians(values[0])
+            cx, cy = values[1:3] if len(values) >= 3 else (0.0, 0.0)
+            cos, sin = math.cos(angle), math.sin(angle)
+            step = (cos, sin, -sin, cos, cx - cos * cx + sin * cy, cy - sin * cx - cos * cy)
+        elif name == 'translate':
+            step = (1.0, 0.0, 0.0, 1.0, values[0], values[1] if len(values) > 1 else 0.0)
+        elif name == 'scale':
+            step = (values[0], 0.0, 0.0, values[1] if len(values) > 1 else values[0], 0.0, 0.0)
+        elif name == 'matrix' and len(values) == 6:
+            step = tuple(values)
+        else:
+            raise UnsupportedSVG(f"transform {name}()")
+        matrix = multiply(matrix, step)
+    return matrix
+
+def apply(matrix, points):
+    a, b, c, d, e, f = matrix
+    return [(a * x + c * y + e, b * x + d * y + f) for x, y in points]
+
+def matrix_scale(matrix):
+    """How much the matrix scales lengths on average, for stroke widths and curve detail"""
+    a, b, c, d = matrix[:4]
+    return math.sqrt(abs(a * d - b * c))
+
+def parse_color(value):
+    """(r, g, b) for a paint value, or None for none"""
+    if value is None or value == 'none' or value == 'transparent':
+        return None
+    if value.startswith('url('):
+        raise UnsupportedSVG(f"paint server {value}")
+    try:
+        return ImageColor.getrgb(value)[:3]
+    except ValueError:
+        raise UnsupportedSVG(f"color {value!r}") from None
+
+def attributes(element, inherited):
+    """The element's presentation attributes, style declarations included, over inherited ones"""
+    attrs = dict(inherited)
+    attrs.update(element.attrib)
+    for declaration in element.get('style', '').split(';'):
+        if ':' in declaration:
+            key, value = declaration.split(':', 1)
+            attrs[key.strip()] = value.strip()
+    return attrs
+
+def ellipse_points(cx, cy, rx, ry, detail):
+    """Outline of an ellipse, `detail` mask pixels per unit
+
+    Chords of a circle of radius r pixels stray at most TOLERANCE inward
+    with pi * sqrt(r / (2 * TOLERANCE)) vertices.
+    """
+    count = max(8, min(256, math.ceil(math.pi * math.sqrt(max(rx, ry) * detail / (2 * TOLERANCE)))))
+    return [(cx + rx * math.cos(2 * math.pi * i / count), cy + ry * math.sin(2 * math.pi * i / count))
+            for i in range(count)]
+
+def rounded_rect_points(x, y, width, height, rx, ry, detail):
+    """Outline of a rect, with elliptical corners when rx/ry are set"""
+    if not rx and not ry:
+        return [(x, y), (x + width, y), (x + width, y + height), (x, y + height)]
+    rx = min(rx or ry, width / 2)
+    ry = min(ry or rx, height / 2)
+    corners = [(x + width - rx, y + ry, -90), (x + width - rx, y + height - ry, 0),
+               (x + rx, y + height - ry, 90), (x + rx, y + ry, 180)]
+    steps = max(2, min(64, math.ceil(math.pi / 2 * math.sqrt(max(rx, ry) * detail / (2 * TOLERANCE)))))
+    return [(cx + rx * math.cos(math.radians(start + 90 * i / steps)),
+             cy + ry * math.sin(math.radians(start + 90 * i / steps)))
+            for cx, cy, start in corners for i in range(steps + 1)]
+
+def bezier(points, detail):
+    """Flatten a quadratic or cubic Bezier (start point excluded) into a polyline
+
+    Wang's formula gives the segments needed to stay within TOLERANCE:
+    sqrt(n(n-1)/8 * M / TOLERANCE) for degree n, M the largest second
+    difference of the control points.
+    """
+    degree = len(points) - 1
+    bend = max(math.hypot(p[0] - 2 * q[0] + r[0], p[1] - 2 * q[1] + r[1])
+               for p, q, r in zip(points, points[1:], points[2:])) * detail
+    count = max(1, min(64, math.ceil(math.sqrt(degree * (degree - 1) / 8 * bend / TOLERANCE))))
+    out = []
+    for i in range(1, count + 1):
+        t = i / count
+        if len(points) == 3:
+            (x0, y0), (x1, y1), (x2, y2) = points
+            u = 1 - t
+            out.append((u * u * x0 + 2 * u * t * x1 + t * t * x2, u * u * y0 + 2 * u * t * y1 + t * t * y2))
+        else:
+            (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points
+            u = 1 - t
+            out.append((u ** 3 * x0 + 3 * u * u * t * x1 + 3 * u * t * t * x2 + t ** 3 * x3,
+                        u ** 3 * y0 + 3 * u * u * t * y1 + 3 * u * t * t * y2 + t ** 3 * y3))
+    return out
+
+def path_subpaths(d, detail):
+    """List (points, closed) for each subpath of path data"""
+    tokens = PATH_TOKEN_RE.findall(d or '')
+    subpaths, points = [], []
+    x = y = 0.0
+    command, i = None, 0
+
+    def take(count):
+        nonlocal i
+        values = [float(v) for v in tokens[i:i + count]]
+        if len(values) < count:
+            raise UnsupportedSVG(f"truncated path data {d!r}")
+        i += count
+        return values
+
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i]
+            i += 1
+        elif command is None:
+            raise UnsupportedSVG(f"path data {d!r}")
+        relative = command.islower()
+        ox, oy = (x, y) if relative else (0.0, 0.0)
+        kind = command.upper()
+        if kind == 'M':
+            if len(points) > 1:
+                subpaths.append((points, False))
+            mx, my = take(2)
+            x, y = ox + mx, oy + my
+            points = [(x, y)]
+            command = 'l' if relative else 'L'  # extra pairs are line-tos
+        elif kind == 'L':
+            lx, ly = take(2)
+            x, y = ox + lx, oy + ly
+            points.append((x, y))
+        elif kind == 'H':
+            x = ox + take(1)[0]
+            points.append((x, y))
+        elif kind == 'V':
+            y = oy + take(1)[0]
+            points.append((x, y))
+        elif kind == 'Q':
+            cx, cy, ex, ey = take(4)
+            control, end = (ox + cx, oy + cy), (ox + ex, oy + ey)
+            points.extend(bezier([(x, y), control, end], detail))
+            x, y = end
+        elif kind == 'C':
+            c1x, c1y, c2x, c2y, ex, ey = take(6)
+            end = (ox + ex, oy + ey)
+            points.extend(bezier([(x, y), (ox + c1x, oy + c1y), (ox + c2x, oy + c2y), end], detail))
+            x, y = end
+        elif kind == 'Z':
+            if len(points) > 1:
+                subpaths.append((points, True))
+            x, y = points[0] if points else (x, y)
+            points = [(x, y)]
+            command = None  # Z takes no numbers
+        else:
+            raise UnsupportedSVG(f"path command {command}")
+    if len(points) > 1:
+        subpaths.append((points, False))
+    return subpaths
+
+def shape_geometry(tag, attrs, detail):
+    """(subpaths, fillable) in user units; fillable is False for line and polyline"""
+    get = lambda name: length(attrs.get(name))
+    if tag == 'circle':
+        r = get('r')
+        return [(ellipse_points(get('cx'), get('cy'), r, r, detail), True)], True
+    if tag == 'ellipse':
+        return [(ellipse_points(get('cx'), get('cy'), get('rx'), get('ry'), detail), True)], True
+    if tag == 'rect':
+        return [(rounded_rect_points(get('x'), get('y'), get('width'), get('height'),
+                                     get('rx'), get('ry'), detail), True)], True
+    if tag in ('polygon', 'polyline'):
+        values = numbers(attrs.get('points'))
+        return [(list(zip(values[::2], values[1::2])), tag == 'polygon')], tag == 'polygon'
+    if tag == 'line':
+        return [([(get('x1'), get('y1')), (get('x2'), get('y2'))], False)], False
+    if tag == 'path':
+        return path_subpaths(attrs.get('d'), detail), True
+    raise UnsupportedSVG(f"<{tag}> element")
+
+def paint(canvas, subpaths, matrix, color, alpha, stroke_width=None):
+    """Composite one filled (stroke_width None) or stroked shape onto an RGBA canvas"""
+    if color is None or alpha <= 0:
+        return
+    subpaths = [(apply(matrix, points), closed) for points, closed in subpaths if len(points) > 1]
+    if not subpaths:
+        return
+    pad = (stroke_width or 0) / 2 + 1
+    xs = [x for points, _ in subpaths for x, _ in points]
+    ys = [y for points, _ in subpaths for _, y in points]
+    left, top = max(int(min(xs) - pad), 0), max(int(min(ys) - pad), 0)
+    right, bottom = min(int(max(xs) + pad) + 1, canvas.width), min(int(max(ys) + pad) + 1, canvas.height)
+    if left >= right or top >= bottom:
+        return
+
+    mask = Image.new('L', ((right - left) * SUPERSAMPLE, (bottom - top) * SUPERSAMPLE))
+    draw = ImageDraw.Draw(mask)
+    for points, closed in subpaths:
+        points = [((x - left) * SUPERSAMPLE, (y - top) * SUPERSAMPLE) for x, y in points]
+        if stroke_width is None:
+            if len(points) > 2:
+                draw.polygon(points, fill=255)
+        else:
+            if closed:
+                points.append(points[0])
+            draw.line(points, fill=255, width=max(round(stroke_width * SUPERSAMPLE), 1), joint='curve')
+    mask = mask.reduce(SUPERSAMPLE)
+    if alpha < 1:
+        mask = ImageChops.multiply(mask, Image.new('L', mask.size, round(alpha * 255)))
+    layer = Image.new('RGBA', mask.size, color + (255,))
+    layer.putalpha(mask)
+    canvas.alpha_composite(layer, (left, top))
+
+def opacity(attrs, name):
+    return float(attrs.get(name, 1)) * float(attrs.get('opacity', 1))
+
+def render_element(canvas, element, matrix, inherited, symbols, group_opacity=1.0):
+    """Draw an element and its children onto the canvas"""
+    tag = local_name(element.tag)
+    if tag in SKIPPED:
+        return
+    attrs = attributes(element, inherited)
+    matrix = multiply(matrix, parse_transform(attrs.get('transform')))
+    if tag in ('g', 'svg'):
+        children = {key: attrs[key] for key in INHERITED if key in attrs}
+        group_opacity *= float(attrs.get('opacity', 1))
+        for child in element:
+            render_element(canvas, child, matrix, children, symbols, group_opacity)
+        return
+    if tag == 'use':
+        href = element.get('href') or element.get('{http://www.w3.org/1999/xlink}href') or ''
+        target = symbols.get(href.lstrip('#'))
+        if target is None:
+            raise UnsupportedSVG(f"<use> of unknown {href!r}")
+        x, y = length(attrs.get('x')), length(attrs.get('y'))
+        matrix = multiply(matrix, (1.0, 0.0, 0.0, 1.0, x, y))
+        if local_name(target.tag) == 'symbol':
+            box = numbers(target.get('viewBox'))
+            width, height = length(attrs.get('width'), box[2]), length(attrs.get('height'), box[3])
+            matrix = multiply(matrix, viewport_matrix(box, width, height))
+            content = list(target)
+        else:
+            content = [target]
+        children = {key: attrs[key] for key in INHERITED if key in attrs}
+        group_opacity *= float(attrs.get('opacity', 1))
+        for child in content:
+            render_element(canvas, child, matrix, children, symbols, group_opacity)
+        return
+
+    detail = matrix_scale(matrix) * SUPERSAMPLE
+    subpaths, fillable = shape_geometry(tag, attrs, detail)
+    if fillable:
+        paint(canvas, [(points, True) for points, _ in subpaths], matrix,
+              parse_color(attrs.get('fill', 'black')), opacity(attrs, 'fill-opacity') * group_opacity)
+    stroke = parse_color(attrs.get('stroke'))
+    if stroke is not None:
+        width = length(attrs.get('stroke-width'), 1.0) * matrix_scale(matrix)
+        paint(canvas, subpaths, matrix, stroke, opacity(attrs, 'stroke-opacity') * group_opacity, width)
+
+def viewport_matrix(box, width, height):
+    """Map a viewBox into width x height, centered and uniformly scaled (xMidYMid meet)"""
+    x, y, box_width, box_height = box
+    scale = min(width / box_width, height / box_height)
+    return (scale, 0.0, 0.0, scale,
+            (width - box_width * scale) / 2 - x * scale, (height - box_height * scale) / 2 - y * scale)
+
+def document_box(root):
+    """(x, y, width, height) of the document's viewBox, or of its width and height"""
+    box = numbers(root.get('viewBox'))
+    if len(box) == 4:
+        return box
+    return [0.0, 0.0, length(root.get('width'), 100.0), length(root.get('height'), 100.0)]
+
+def load_root(source):
+    """Parse a path, bytes or str of SVG into its root element; an Element passes through"""
+    if isinstance(source, ET.Element):
+        return source
+    if isinstance(source, (bytes, str)) and source.lstrip()[:1] in ('<', b'<'):
+        return ET.fromstring(source)
+    return ET.parse(source).getroot()
+
+def rasterize(source, width=None, height=None):
+    """Render an SVG to an RGBA image
+
+    With only width (or only height) the other side follows the viewBox;
+    with both, the drawing is centered in that box at its own aspect ratio.
+    Without either the image is one pixel per user unit.
+    """
+    root = load_root(source)
+    box = document_box(root)
+    if width is None and height is None:
+        width, height = box[2], box[3]
+    elif height is None:
+        height = width * box[3] / box[2]
+    elif width is None:
+        width = height * box[2] / box[3]
+    width, height = max(round(width), 1), max(round(height), 1)
+
+    symbols = {element.get('id'): element for element in root.iter() if element.get('id')}
+    canvas = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    matrix = viewport_matrix(box, width, height)
+    for child in root:
+        render_element(canvas, child, matrix, {}, symbols, float(root.get('opacity', 1)))
+    return canvas
+
+def write_thumbnails(decorations_dir="elements/decorations", output_dir=None, size=THUMBNAIL_SIZE):
+    """Rasterize every decoration SVG to a PNG whose longer side is `size` pixels
+
+    Returns (written, skipped) file names; decorations using anything
+    outside the subset are skipped with a message.
+    """
+    decorations_dir = Path(decorations_dir)
+    output_dir = Path(output_dir) if output_dir else decorations_dir / "thumbnails"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written, skipped = [], []
+    for path in sorted(decorations_dir.glob('*.svg')):
+        if path.stem.startswith('atlas'):
+            continue
+        try:
+            root = load_root(path)
+            box = document_box(root)
+            if box[2] >= box[3]:
+                img = rasterize(root, width=size)
+            else:
+                img = rasterize(root, height=size)
+        except (UnsupportedSVG, ET.ParseError) as e:
+            print(f"Skipping {path.name}: {e}")
+            skipped.append(path.name)
+            continue
+        filename = f"{path.stem}.png"
+        img.save(output_dir / filename, 'PNG')
+        written.append(filename)
+    return written, skipped
+
+def parse_args(argv=None, prog=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(prog=prog, description="Rasterize decoration SVGs to PNG thumbnails")
+    parser.add_argument('--dir', default="elements/decorations",
+                        help="directory of decoration SVGs (default: elements/decorations)")
+    parser.add_argument('--out', help="where the PNGs go (default: DIR/thumbnails)")
+    parser.add_argument('--size', type=int, default=THUMBNAIL_SIZE,
+                        help=f"longer side of each thumbnail in pixels (default: {THUMBNAIL_SIZE})")
+    return parser.parse_args(argv)
+
+def main(argv=None, prog=None):
+    """Write thumbnails for the given directory"""
+    args = parse_args(argv, prog)
+    start = time.perf_counter()
+    written, skipped = write_thumbnails(args.dir, args.out, args.size)
+    print(f"Rasterized {len(written)} decorations in {time.perf_counter() - start:.2f} seconds"
+          + (f" ({len(skipped)} skipped)" if skipped else ""))
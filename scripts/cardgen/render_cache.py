@@ -0,0 +1,166 @@
+"""
+Two-level cache for rasterized layers and composited images
+
+Rendering an SVG layer is far slower than reading it back, and batches
+reuse the same few backgrounds and decorations thousands of times. Keys
+are built from the source file's content hash plus whatever else decides
+the pixels (scale, rotation, opacity, output size), so an edited file
+never hits a stale entry. Images live in an in-process LRU and, when a
+directory is given, in a content-addressed PNG store on disk that other
+processes and later runs share; both are bounded by size.
+"""
+
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from PIL import Image, PngImagePlugin
+
+# Defaults for the two levels, in bytes of decoded (memory) or encoded (disk) images
+MEMORY_LIMIT = 256 * 1024 * 1024
+DISK_LIMIT = 1024 * 1024 * 1024
+
+# When the disk store is over its limit it is trimmed to this fraction of it,
+# so a full cache isn't rescanned on every write
+DISK_TRIM_RATIO = 0.8
+
+class LayerCache:
+    """LRU of (image, info) pairs in memory, backed by an optional on-disk store"""
+
+    def __init__(self, directory=None, memory_limit=MEMORY_LIMIT, disk_limit=DISK_LIMIT):
+        self.directory = directory
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self.entries = OrderedDict()
+        self.memory_bytes = 0
+        self.disk_bytes = None  # measured on the first write
+        self.digests = {}
+        self.hits = self.disk_hits = self.misses = 0
+
+    def file_digest(self, path):
+        """SHA-256 of a file, remembered until its size or mtime changes"""
+        stat = os.stat(path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        cached = self.digests.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        self.digests[path] = (stamp, digest.hexdigest())
+        return digest.hexdigest()
+
+    def key(self, *parts):
+        """Cache key for a render; file paths among the parts are replaced by their content hash"""
+        resolved = [self.file_digest(str(part)) if isinstance(part, os.PathLike) else part
+                    for part in parts]
+        return hashlib.sha256(json.dumps(resolved, sort_keys=True).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    def get(self, key):
+        """Return (image, info) for key, or None; disk hits are promoted into memory"""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        if self.directory:
+            path = self._path(key)
+            try:
+                with Image.open(path) as img:
+                    img.load()
+                    info = json.loads(img.text.get('info', 'null'))
+                    value = (img.copy(), info)
+                # Refresh the mtime so eviction treats it as recently used
+                os.utime(path)
+            except (OSError, ValueError):
+                value = None
+            if value is not None:
+                self.disk_hits += 1
+                self._remember(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key, img, info=None):
+        """Store an image (and a JSON-able info value) under key in both levels"""
+        value = (img, info)
+        self._remember(key, value)
+        if self.directory:
+            self._store(key, value)
+        return value
+
+    def fetch(self, key, render):
+        """get(key), calling render() -> (image, info) and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, *render())
+        return value
+
+    def _remember(self, key, value):
+        if key in self.entries:
+            return
+        self.entries[key] = value
+        self.memory_bytes += _image_bytes(value[0])
+        # Least recently used first; always keep the entry just added
+        while self.memory_bytes > self.memory_limit and len(self.entries) > 1:
+            _, (img, _) = self.entries.popitem(last=False)
+            self.memory_bytes -= _image_bytes(img)
+
+    def _store(self, key, value):
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        metadata = PngImagePlugin.PngInfo()
+        metadata.add_text('info', json.dumps(value[1]))
+        # Unique temp name so concurrent workers never write the same file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        value[0].save(tmp_path, 'PNG', pnginfo=metadata, compress_level=1)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        if self.disk_bytes is None:
+            self.disk_bytes = sum(entry[1] for entry in self._disk_entries())
+        else:
+            self.disk_bytes += size
+        if self.disk_bytes > self.disk_limit:
+            self.trim()
+
+    def _disk_entries(self):
+        """(path, size, mtime) of every stored image"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.png'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def trim(self):
+        """Delete the least recently used stored images until the store fits again"""
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.disk_limit * DISK_TRIM_RATIO
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self.disk_bytes = total
+
+    def stats(self):
+        """Counters for the end-of-run summary"""
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'entries': len(self.entries), 'memory_bytes': self.memory_bytes}
+
+def _image_bytes(img):
+    return img.width * img.height * len(img.getbands())
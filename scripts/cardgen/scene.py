@@ -0,0 +1,441 @@
+"""
+Compact shape scenes shared by the background and decoration generators
+
+A Scene stores flat shapes (rects, circles, ellipses, polygons, polylines,
+lines and quadratic curves) column by column in typed arrays rather than
+as one object or SVG string per shape. Whole-scene moves, scales,
+rotations and recolors work on those columns, with NumPy when it is
+installed; it is imported on first use, so writing SVG never loads it.
+Backends turn a scene into output: SVG text, or an antialiased RGBA
+image drawn by Pillow or covered analytically with NumPy.
+"""
+
+import math
+from array import array
+from itertools import chain
+
+from .svgwriter import SVGWriter
+
+# Shape kinds, one byte per shape; TAGS holds each kind's SVG element
+RECT, CIRCLE, ELLIPSE, POLYGON, POLYLINE, LINE, QUAD = range(7)
+TAGS = ('rect', 'circle', 'ellipse', 'polygon', 'polyline', 'line', 'path')
+
+# Kinds that are only ever stroked
+OPEN_KINDS = (POLYLINE, LINE, QUAD)
+
+class Scene:
+    """Shapes on a width x height canvas, one column per property
+
+    Shape i is entry i of kind, fill and stroke (palette indexes, -1 for
+    none), opacity, stroke_width and angle (degrees, about its pivot), and
+    entries 2i and 2i+1 of pivot and size (a rect's width and height or an
+    ellipse's radii). Its points (a rect's corner, an ellipse's center, a
+    path's vertices) are points[2 * start[i]:2 * start[i + 1]].
+
+    Numbers are float32: exact for whole and half units and good to about
+    7 significant digits otherwise. A shape costs about 45 bytes plus 8 per
+    point, where a dict of attributes costs several hundred.
+    """
+
+    __slots__ = ('width', 'height', 'palette', '_colors', 'kind', 'fill', 'stroke', 'opacity',
+                 'stroke_width', 'angle', 'pivot', 'size', 'start', 'points')
+
+    def __init__(self, width, height, palette=None):
+        self.width, self.height = width, height
+        self.palette = []
+        self._colors = {}
+        self.kind = array('B')
+        self.fill = array('h')
+        self.stroke = array('h')
+        self.opacity = array('f')
+        self.stroke_width = array('f')
+        self.angle = array('f')
+        self.pivot = array('f')
+        self.size = array('f')
+        self.start = array('I', [0])
+        self.points = array('f')
+        for color in palette or ():
+            self.color(color)
+
+    def __len__(self):
+        return len(self.kind)
+
+    def color(self, value):
+        """Palette index of a color, adding it on first use; None is -1"""
+        if value is None:
+            return -1
+        key = tuple(value) if isinstance(value, list) else value
+        index = self._colors.get(key)
+        if index is None:
+            index = self._colors[key] = len(self.palette)
+            self.palette.append(key)
+        return index
+
+    def add(self, kind, points, fill=None, stroke=None, stroke_width=0, opacity=1,
+            size=(0, 0), rotate=0, pivot=None):
+        """Append one shape; points is a sequence of (x, y) and pivot defaults to the first"""
+        self.kind.append(kind)
+        self.fill.append(self.color(fill))
+        self.stroke.append(self.color(stroke))
+        self.stroke_width.append(stroke_width)
+        self.opacity.append(opacity)
+        self.angle.append(rotate)
+        self.pivot.extend(pivot or points[0])
+        self.size.extend(size)
+        self.points.extend(chain.from_iterable(points))
+        self.start.append(len(self.points) // 2)
+
+    def rect(self, x, y, width, height, rotate=0, pivot=None, **paint):
+        """Rect with its top-left corner at x, y, rotated about its center by default"""
+        self.add(RECT, [(x, y)], size=(width, height), rotate=rotate,
+                 pivot=pivot or (x + width / 2, y + height / 2), **paint)
+
+    def circle(self, cx, cy, r, **paint):
+        self.add(CIRCLE, [(cx, cy)], size=(r, r), **paint)
+
+    def ellipse(self, cx, cy, rx, ry, rotate=0, pivot=None, **paint):
+        """Ellipse rotated about its center by default"""
+        self.add(ELLIPSE, [(cx, cy)], size=(rx, ry), rotate=rotate, pivot=pivot, **paint)
+
+    def polygon(self, points, **paint):
+        self.add(POLYGON, points, **paint)
+
+    def polyline(self, points, **paint):
+        self.add(POLYLINE, points, **paint)
+
+    def line(self, x1, y1, x2, y2, **paint):
+        self.add(LINE, [(x1, y1), (x2, y2)], **paint)
+
+    def quad(self, x0, y0, x1, y1, x2, y2, **paint):
+        """Quadratic Bezier from x0, y0 to x2, y2 with control point x1, y1"""
+        self.add(QUAD, [(x0, y0), (x1, y1), (x2, y2)], **paint)
+
+    def shape_points(self, i):
+        """Shape i's points as (x, y) tuples"""
+        flat = self.points[2 * self.start[i]:2 * self.start[i + 1]]
+        return list(zip(flat[::2], flat[1::2]))
+
+    def copy(self):
+        """An independent copy, for transforming without touching the original"""
+        scene = Scene(self.width, self.height)
+        # Taken verbatim: after a merging recolor the palette may hold a color
+        # twice, and rebuilding it through color() would shift the indexes
+        scene.palette, scene._colors = list(self.palette), dict(self._colors)
+        for name in ('kind', 'fill', 'stroke', 'opacity', 'stroke_width', 'angle', 'pivot', 'size',
+                     'start', 'points'):
+            setattr(scene, name, array(getattr(self, name).typecode, getattr(self, name)))
+        return scene
+
+    def nbytes(self):
+        """Bytes held by the shape columns"""
+        return sum(column.itemsize * len(column) for column in
+                   (self.kind, self.fill, self.stroke, self.opacity, self.stroke_width, self.angle,
+                    self.pivot, self.size, self.start, self.points))
+
+    def translate(self, dx, dy):
+        """Move every shape by dx, dy"""
+        np = _numpy()
+        for column in (self.points, self.pivot):
+            if np is not None:
+                _pairs(column)[:] += (dx, dy)
+            else:
+                column[:] = array('f', [value + (dy if i % 2 else dx) for i, value in enumerate(column)])
+
+    def scale(self, factor, origin=(0, 0)):
+        """Scale every shape, stroke widths included, by factor about origin"""
+        ox, oy = origin
+        np = _numpy()
+        if np is not None:
+            for column in (self.points, self.pivot):
+                xy = _pairs(column)
+                xy[:] = (xy - (ox, oy)) * factor + (ox, oy)
+            for column in (self.size, self.stroke_width):
+                np.frombuffer(column, dtype=np.float32)[:] *= factor
+            return
+        for column in (self.points, self.pivot):
+            column[:] = array('f', [(oy if i % 2 else ox) + (value - (oy if i % 2 else ox)) * factor
+                                    for i, value in enumerate(column)])
+        for column in (self.size, self.stroke_width):
+            column[:] = array('f', [value * factor for value in column])
+
+    def rotate(self, degrees, origin=(0, 0)):
+        """Rotate the whole scene by degrees (clockwise, y down) about origin
+
+        Each shape's pivot swings about origin and its own angle grows by
+        degrees, while its points move with the pivot; rects and ellipses
+        therefore stay rects and ellipses, only turned.
+        """
+        if not len(self):
+            return
+        cos_a, sin_a = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+        ox, oy = origin
+        np = _numpy()
+        if np is not None:
+            pivot = _pairs(self.pivot)
+            x, y = pivot[:, 0] - ox, pivot[:, 1] - oy
+            moved = np.stack([ox + x * cos_a - y * sin_a, oy + x * sin_a + y * cos_a], axis=1)
+            shift = moved - pivot
+            counts = np.diff(np.frombuffer(self.start, dtype=np.uint32))
+            _pairs(self.points)[:] += np.repeat(shift, counts, axis=0)
+            pivot[:] = moved
+            np.frombuffer(self.angle, dtype=np.float32)[:] += degrees
+            return
+        for i in range(len(self)):
+            px, py = self.pivot[2 * i] - ox, self.pivot[2 * i + 1] - oy
+            dx = ox + px * cos_a - py * sin_a - self.pivot[2 * i]
+            dy = oy + px * sin_a + py * cos_a - self.pivot[2 * i + 1]
+            self.pivot[2 * i] += dx
+            self.pivot[2 * i + 1] += dy
+            for j in range(self.start[i], self.start[i + 1]):
+                self.points[2 * j] += dx
+                self.points[2 * j + 1] += dy
+            self.angle[i] += degrees
+
+    def recolor(self, mapping):
+        """Swap colors for every shape at once: mapping is a dict (missing colors stay) or a function
+
+        Shapes hold palette indexes, so this only rewrites the palette.
+        """
+        lookup = mapping if callable(mapping) else lambda color: mapping.get(color, color)
+        palette = [lookup(color) for color in self.palette]
+        self.palette, self._colors = [], {}
+        for color in palette:
+            key = tuple(color) if isinstance(color, list) else color
+            self.palette.append(key)
+            self._colors.setdefault(key, len(self.palette) - 1)
+
+    def outline(self, i, detail=1.0):
+        """Shape i as a list of (points, closed), rotation applied and curves flattened
+
+        detail is output pixels per scene unit, which sets how finely
+        ellipses and curves are cut into segments.
+        """
+        from .rasterize import bezier, ellipse_points
+        kind, points = self.kind[i], self.shape_points(i)
+        width, height = self.size[2 * i], self.size[2 * i + 1]
+        if kind == RECT:
+            (x, y), = points
+            points = [(x, y), (x + width, y), (x + width, y + height), (x, y + height)]
+        elif kind in (CIRCLE, ELLIPSE):
+            (cx, cy), = points
+            points = ellipse_points(cx, cy, width, height, detail)
+        elif kind == QUAD:
+            points = points[:1] + bezier(points, detail)
+        angle = self.angle[i]
+        if angle:
+            cos_a, sin_a = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+            px, py = self.pivot[2 * i], self.pivot[2 * i + 1]
+            points = [(px + (x - px) * cos_a - (y - py) * sin_a, py + (x - px) * sin_a + (y - py) * cos_a)
+                      for x, y in points]
+        return [(points, kind not in OPEN_KINDS)]
+
+    def bounds(self, i):
+        """(left, top, right, bottom) of shape i, not counting its stroke"""
+        kind, points = self.kind[i], self.shape_points(i)
+        if kind in (RECT, CIRCLE, ELLIPSE):
+            (x, y), = points
+            width, height = self.size[2 * i], self.size[2 * i + 1]
+            points = ([(x, y), (x + width, y + height)] if kind == RECT
+                      else [(x - width, y - height), (x + width, y + height)])
+            if self.angle[i]:
+                # The turned box's corners bound the turned shape
+                (x0, y0), (x1, y1) = points
+                cos_a, sin_a = math.cos(math.radians(self.angle[i])), math.sin(math.radians(self.angle[i]))
+                px, py = self.pivot[2 * i], self.pivot[2 * i + 1]
+                points = [(px + (x - px) * cos_a - (y - py) * sin_a, py + (x - px) * sin_a + (y - py) * cos_a)
+                          for x, y in ((x0, y0), (x1, y0), (x1, y1), (x0, y1))]
+        elif self.angle[i]:
+            points = self.outline(i)[0][0]
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        return min(xs), min(ys), max(xs), max(ys)
+
+def _numpy():
+    """The numpy module, or None when it is not installed"""
+    try:
+        import numpy
+    except ImportError:  # NumPy is optional; transforms loop in Python and the numpy backend is unavailable
+        return None
+    return numpy
+
+def _pairs(column):
+    """Writable (n, 2) NumPy view of a float32 array of x, y pairs"""
+    import numpy as np
+    return np.frombuffer(column, dtype=np.float32).reshape(-1, 2)
+
+def to_svg(scene, out=None, minify=False, precision=2):
+    """SVG backend: write the scene with an SVGWriter; returns the text when out is None"""
+    svg = SVGWriter(out, scene.width, scene.height, minify, precision)
+    palette = scene.palette
+    number = svg.number
+
+    for i in range(len(scene)):
+        kind, points = scene.kind[i], scene.shape_points(i)
+        width, height = scene.size[2 * i], scene.size[2 * i + 1]
+        if kind == RECT:
+            (x, y), = points
+            attrs = {'x': number(x), 'y': number(y), 'width': number(width), 'height': number(height)}
+        elif kind == CIRCLE:
+            (x, y), = points
+            attrs = {'cx': number(x), 'cy': number(y), 'r': number(width)}
+        elif kind == ELLIPSE:
+            (x, y), = points
+            attrs = {'cx': number(x), 'cy': number(y), 'rx': number(width), 'ry': number(height)}
+        elif kind == LINE:
+            (x1, y1), (x2, y2) = points
+            attrs = {'x1': number(x1), 'y1': number(y1), 'x2': number(x2), 'y2': number(y2)}
+        elif kind == QUAD:
+            (x0, y0), (x1, y1), (x2, y2) = points
+            attrs = {'d': f"M{number(x0)},{number(y0)} Q{number(x1)},{number(y1)} {number(x2)},{number(y2)}"}
+        else:
+            attrs = {'points': " ".join(f"{number(x)},{number(y)}" for x, y in points)}
+
+        fill, stroke = scene.fill[i], scene.stroke[i]
+        if kind not in OPEN_KINDS:
+            attrs['fill'] = palette[fill] if fill >= 0 else 'none'
+        if stroke >= 0:
+            attrs['stroke'] = palette[stroke]
+            attrs['stroke_width'] = number(scene.stroke_width[i])
+            if kind in (POLYLINE, QUAD):
+                attrs['fill'] = 'none'
+        if scene.opacity[i] != 1:
+            attrs['opacity'] = number(scene.opacity[i])
+        if scene.angle[i]:
+            attrs['transform'] = (f"rotate({number(scene.angle[i])} "
+                                  f"{number(scene.pivot[2 * i])} {number(scene.pivot[2 * i + 1])})")
+        svg.add(TAGS[kind], **attrs)
+    return svg.close()
+
+def raster_size(scene, width=None, height=None):
+    """Output size and scene-to-pixel matrix, sized as rasterize.rasterize() sizes an SVG"""
+    from .rasterize import viewport_matrix
+    if width is None and height is None:
+        width, height = scene.width, scene.height
+    elif height is None:
+        height = width * scene.height / scene.width
+    elif width is None:
+        width = height * scene.width / scene.height
+    width, height = max(round(width), 1), max(round(height), 1)
+    return width, height, viewport_matrix((0, 0, scene.width, scene.height), width, height)
+
+def paints(scene, matrix):
+    """(subpaths, rgb, alpha, stroke width or None for a fill) of every fill and stroke, in pixels"""
+    from .rasterize import SUPERSAMPLE, apply, matrix_scale, parse_color
+    scale = matrix_scale(matrix)
+    colors = [parse_color(color) if isinstance(color, str) else tuple(color[:3]) for color in scene.palette]
+    for i in range(len(scene)):
+        # Flattened as finely as the rasterizer flattens SVG shapes
+        subpaths = [(apply(matrix, points), closed) for points, closed in scene.outline(i, scale * SUPERSAMPLE)]
+        if scene.fill[i] >= 0 and scene.kind[i] not in OPEN_KINDS:
+            yield subpaths, colors[scene.fill[i]], scene.opacity[i], None
+        if scene.stroke[i] >= 0:
+            yield subpaths, colors[scene.stroke[i]], scene.opacity[i], scene.stroke_width[i] * scale
+
+def render_pil(scene, width=None, height=None):
+    """Pillow backend: an RGBA image drawn with the built-in SVG rasterizer's supersampled painter"""
+    from PIL import Image
+    from .rasterize import IDENTITY, paint
+    width, height, matrix = raster_size(scene, width, height)
+    canvas = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    for subpaths, color, alpha, stroke_width in paints(scene, matrix):
+        paint(canvas, subpaths, IDENTITY, color, alpha, stroke_width)
+    return canvas
+
+# Pixels x edges handled per NumPy pass, which bounds the backend's working memory
+COVERAGE_BLOCK = 1 << 20
+
+def coverage(subpaths, stroke_width, left, top, right, bottom):
+    """Fraction of each pixel in the box covered by a fill or stroke, from distances to its edges
+
+    Pixel centers within half a pixel of the outline are partly covered,
+    in proportion to how far in they are; even-odd crossings tell inside
+    from outside for fills. Strokes end in SVG's default butt caps and
+    are rounded only in the wedge outside a corner, like the rasterizer's
+    curve joints.
+    """
+    import numpy as np
+    edges, previous, following = [], [], []
+    for points, closed in subpaths:
+        ends = points[1:] + points[:1] if closed or stroke_width is None else points[1:]
+        first, count = len(edges), len(ends)
+        edges.extend((x0, y0, x1, y1) for (x0, y0), (x1, y1) in zip(points, ends))
+        # The edges meeting each edge's start and end; -1 at an open stroke's ends
+        previous.extend(first + (k - 1) % count if closed or k else -1 for k in range(count))
+        following.extend(first + (k + 1) % count if closed or k < count - 1 else -1 for k in range(count))
+    x0, y0, x1, y1 = (column[:, None, None] for column in np.asarray(edges, dtype=np.float32).T)
+    previous, following = np.asarray(previous, np.intp), np.asarray(following, np.intp)
+    has_previous, has_following = previous[:, None, None] >= 0, following[:, None, None] >= 0
+    dx, dy = x1 - x0, y1 - y0
+    length2 = np.maximum(dx * dx + dy * dy, 1e-12)
+    length = np.sqrt(length2)
+    px = np.arange(left, right, dtype=np.float32)[None, None, :] + 0.5
+
+    rows = max(COVERAGE_BLOCK // (len(edges) * (right - left)), 1)
+    out = np.empty((bottom - top, right - left), np.float32)
+    for row in range(top, bottom, rows):
+        py = np.arange(row, min(row + rows, bottom), dtype=np.float32)[None, :, None] + 0.5
+        t = ((px - x0) * dx + (py - y0) * dy) / length2
+        nearest = np.clip(t, 0, 1)
+        distance = np.sqrt((px - x0 - nearest * dx) ** 2 + (py - y0 - nearest * dy) ** 2)
+        if stroke_width is None:
+            distance = distance.min(axis=0)
+            crossing = ((y0 > py) != (y1 > py)) & (px < x0 + (py - y0) * dx / np.where(dy == 0, 1, dy))
+            inside = crossing.sum(axis=0) % 2 == 1
+            cover = np.clip(0.5 + np.where(inside, distance, -distance), 0, 1)
+        else:
+            # Past either end an edge stops square, unless the pixel is also
+            # past the neighbouring edge, in the wedge its round joint fills
+            before, after = t < 0, t > 1
+            joint = ((before & has_previous & after[previous]) |
+                     (after & has_following & before[following]))
+            beyond = np.maximum(-t, t - 1) * length
+            across = np.abs((px - x0) * dy - (py - y0) * dx) / length
+            square = np.where(beyond > 0, np.maximum(across, stroke_width / 2 + beyond), across)
+            distance = np.where(joint, distance, square).min(axis=0)
+            cover = np.clip(0.5 + stroke_width / 2 - distance, 0, min(stroke_width, 1))
+        out[row - top:row - top + len(cover)] = cover
+    return out
+
+def render_numpy(scene, width=None, height=None):
+    """NumPy backend: an RGBA image with every shape's coverage computed analytically
+
+    Each fill or stroke is covered over just its bounding box and
+    composited in premultiplied float32, so there is no supersampling.
+    """
+    import numpy as np
+    from PIL import Image
+    width, height, matrix = raster_size(scene, width, height)
+    canvas = np.zeros((height, width, 4), np.float32)
+    for subpaths, color, alpha, stroke_width in paints(scene, matrix):
+        subpaths = [(points, closed) for points, closed in subpaths if len(points) > 1]
+        if not subpaths or alpha <= 0:
+            continue
+        pad = (stroke_width or 0) / 2 + 1
+        xs = [x for points, _ in subpaths for x, _ in points]
+        ys = [y for points, _ in subpaths for _, y in points]
+        left, top = max(int(min(xs) - pad), 0), max(int(min(ys) - pad), 0)
+        right, bottom = min(int(max(xs) + pad) + 1, width), min(int(max(ys) + pad) + 1, height)
+        if left >= right or top >= bottom:
+            continue
+        cover = coverage(subpaths, stroke_width, left, top, right, bottom)[..., None] * alpha
+        region = canvas[top:bottom, left:right]
+        region *= 1 - cover
+        region += cover * np.array(color + (255,), np.float32) / 255
+
+    alpha = canvas[..., 3:]
+    rgb = np.divide(canvas[..., :3], alpha, out=np.zeros_like(canvas[..., :3]), where=alpha > 0)
+    pixels = np.concatenate([rgb, alpha], axis=2) * 255 + 0.5
+    return Image.fromarray(pixels.clip(0, 255).astype(np.uint8), 'RGBA')
+
+# Every way to turn a scene into output, by name
+BACKENDS = {
+    'svg': to_svg,
+    'pil': render_pil,
+    'numpy': render_numpy,
+}
+
+def render(scene, backend='svg', **options):
+    """Hand the scene to a backend from BACKENDS"""
+    if backend == 'numpy' and _numpy() is None:
+        raise RuntimeError("the numpy backend needs NumPy installed")
+    return BACKENDS[backend](scene, **options)
@@ -0,0 +1,115 @@
+"""
+Streaming SVG writer shared by the decoration generator and scene.to_svg
+
+Standard library only.
+"""
+
+import re
+
+# Presentation attributes children inherit from a <g>, so runs can share them
+INHERITED_ATTRIBUTES = ('fill', 'fill-opacity', 'stroke', 'stroke-width', 'stroke-opacity')
+
+NUMBER_RE = re.compile(r'-?\d*\.\d+')
+HEX_COLOR_RE = re.compile(r'^#([0-9A-Fa-f])\1([0-9A-Fa-f])\2([0-9A-Fa-f])\3$')
+
+def plain_number(value, precision):
+    """Format a number with at most `precision` decimals and no trailing zeros"""
+    text = f"{float(value):.{precision}f}"
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    return '0' if text in ('-0', '') else text
+
+def compact_number(value, precision):
+    """plain_number without the leading zero of a fraction, as minified output writes it"""
+    text = plain_number(value, precision)
+    return text.replace('0.', '.', 1) if text.startswith(('0.', '-0.')) else text
+
+def compact_value(value, precision):
+    """Quantize every decimal in an attribute value and shorten #RRGGBB colors"""
+    text = NUMBER_RE.sub(lambda m: compact_number(m.group(), precision), str(value))
+    return HEX_COLOR_RE.sub(r'#\1\2\3', text)
+
+class SVGWriter:
+    """Incremental SVG document writer
+    
+    Elements are written to `out` (any file-like object with write()) as they
+    are added, or collected in a list and joined once by close() when no
+    output is given. Either way building a document is linear in its size.
+    
+    With minify=True numbers are rounded to `precision` decimals, whitespace
+    is dropped, and consecutive elements sharing inherited attributes are
+    wrapped in a <g> carrying them. Only the current run is held back.
+    """
+    
+    def __init__(self, out=None, width=100, height=100, minify=False, precision=2):
+        self._parts = None if out is not None else []
+        self._write = out.write if out is not None else self._parts.append
+        self.minify = minify
+        self.precision = precision
+        self._run = []
+        self._shared = {}
+        newline = '' if minify else '\n'
+        self._write(f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
+                    f'xmlns="http://www.w3.org/2000/svg">{newline}')
+    
+    def number(self, value):
+        """A number as this document writes it: compacted when minifying, else plainly"""
+        return (compact_number if self.minify else plain_number)(value, self.precision)
+    
+    def add(self, tag, **attrs):
+        """Write one empty element; underscores in attribute names become hyphens"""
+        attrs = {key.replace('_', '-'): value for key, value in attrs.items()}
+        if not self.minify:
+            self._write(f'  <{tag} {self._attributes(attrs)}/>\n')
+            return
+        
+        attrs = {key: compact_value(value, self.precision) for key, value in attrs.items()}
+        inherited = {key: attrs[key] for key in INHERITED_ATTRIBUTES if key in attrs}
+        # opacity isn't inherited, but on a fill-only or stroke-only shape it
+        # renders exactly like fill-opacity/stroke-opacity, which can be hoisted
+        alias = None
+        if 'opacity' in attrs:
+            if 'stroke' not in attrs:
+                alias = 'fill-opacity'
+            elif attrs.get('fill') == 'none':
+                alias = 'stroke-opacity'
+        if alias:
+            inherited[alias] = attrs['opacity']
+        
+        # Extend the current run while it still has some inherited attribute in common
+        shared = {key: value for key, value in self._shared.items() if inherited.get(key) == value}
+        if not shared:
+            self._flush()
+            shared = inherited
+        self._run.append((tag, attrs, alias))
+        self._shared = shared
+    
+    def close(self):
+        """Finish the document; returns the SVG text when buffering, else None"""
+        self._flush()
+        self._write('</svg>')
+        if self._parts is not None:
+            return "".join(self._parts)
+        return None
+    
+    @staticmethod
+    def _attributes(attrs):
+        return " ".join(f'{key}="{value}"' for key, value in attrs.items())
+    
+    def _flush(self):
+        """Write the pending run, grouped only when that saves bytes"""
+        run, shared = self._run, self._shared
+        self._run, self._shared = [], {}
+        if not run:
+            return
+        shared_text = self._attributes(shared)
+        if len(run) == 1 or (len(run) - 1) * (len(shared_text) + 1) <= len('<g ></g>'):
+            shared_text, shared = '', {}
+        if shared:
+            self._write(f'<g {shared_text}>')
+        for tag, attrs, alias in run:
+            own = {key: value for key, value in attrs.items()
+                   if key not in shared and not (key == 'opacity' and alias in shared)}
+            self._write(f'<{tag} {self._attributes(own)}/>')
+        if shared:
+            self._write('</g>')
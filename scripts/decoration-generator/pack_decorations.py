@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Pack all decoration SVGs into a single sprite atlas
+
+Kept so existing commands keep working; the code lives in the cardgen
+package. Same as: python -m scripts.cardgen atlas
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from scripts.cardgen.cli import main
+
+if __name__ == "__main__":
+    main(['atlas'] + sys.argv[1:])